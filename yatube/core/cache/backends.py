@@ -0,0 +1,408 @@
+"""Кэш-бэкенды проекта."""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Локальные LRU живут на уровне процесса, а не экземпляра бэкенда:
+# django.core.cache.caches создаёт экземпляр на каждый поток.
+_local_stores = {}
+_local_locks = {}
+
+MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """Ограниченный LRU в памяти процесса перед общим кэшем.
+
+    Значения хранятся вместе со сроком «свежести». После него запись ещё
+    STALE_TIMEOUT секунд лежит в общем кэше: первый обратившийся получает
+    промах и блокировку на пересчёт, остальные продолжают получать
+    устаревшую копию, пока он не запишет новую.
+
+    OPTIONS: SHARED — алиас общего кэша, LOCAL_MAX_ENTRIES,
+    LOCAL_TIMEOUT — сколько секунд запись живёт в памяти процесса,
+    STALE_TIMEOUT и LOCK_TIMEOUT.
+    """
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED', 'shared')
+        self.local_max_entries = int(options.get('LOCAL_MAX_ENTRIES', 1000))
+        self.local_timeout = float(options.get('LOCAL_TIMEOUT', 5))
+        self.stale_timeout = int(options.get('STALE_TIMEOUT', 60))
+        self.lock_timeout = int(options.get('LOCK_TIMEOUT', 10))
+        self._local = _local_stores.setdefault(name, OrderedDict())
+        self._lock = _local_locks.setdefault(name, Lock())
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def make_key(self, key, version=None):
+        return self.shared.make_key(key, version=version)
+
+    def _lock_key(self, key):
+        return f'{key}:regenerating'
+
+    def _local_get(self, full_key):
+        with self._lock:
+            item = self._local.get(full_key)
+            if item is None:
+                return None
+            pickled, expires = item
+            if expires <= time.monotonic():
+                del self._local[full_key]
+                return None
+            self._local.move_to_end(full_key)
+        return pickle.loads(pickled)
+
+    def _local_set(self, full_key, envelope):
+        pickled = pickle.dumps(envelope, self.pickle_protocol)
+        with self._lock:
+            self._local[full_key] = (
+                pickled, time.monotonic() + self.local_timeout
+            )
+            self._local.move_to_end(full_key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, full_key):
+        with self._lock:
+            self._local.pop(full_key, None)
+
+    def _envelope(self, value, timeout):
+        """Значение со сроком свежести и таймаут для общего кэша."""
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return (value, None), None
+        if timeout <= 0:
+            return (value, time.time()), 0
+        return (value, time.time() + timeout), timeout + self.stale_timeout
+
+    def _unwrap(self, key, full_key, envelope, version):
+        value, fresh_until = envelope
+        if fresh_until is None or time.time() < fresh_until:
+            return value
+        if self.shared.add(
+            self._lock_key(key), 1, self.lock_timeout, version=version
+        ):
+            self._local_delete(full_key)
+            return MISSING
+        return value
+
+    def _fetch(self, key, version):
+        full_key = self.make_key(key, version)
+        envelope = self._local_get(full_key)
+        if envelope is None:
+            envelope = self.shared.get(key, version=version)
+            if envelope is None:
+                return MISSING
+            self._local_set(full_key, envelope)
+        return self._unwrap(key, full_key, envelope, version)
+
+    def get(self, key, default=None, version=None):
+        value = self._fetch(key, version)
+        return default if value is MISSING else value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = []
+        for key in keys:
+            full_key = self.make_key(key, version)
+            envelope = self._local_get(full_key)
+            if envelope is None:
+                missing.append(key)
+            else:
+                found[key] = (full_key, envelope)
+        if missing:
+            for key, envelope in self.shared.get_many(
+                missing, version=version
+            ).items():
+                full_key = self.make_key(key, version)
+                self._local_set(full_key, envelope)
+                found[key] = (full_key, envelope)
+        result = {}
+        for key, (full_key, envelope) in found.items():
+            value = self._unwrap(key, full_key, envelope, version)
+            if value is not MISSING:
+                result[key] = value
+        return result
+
+    def has_key(self, key, version=None):
+        return self._fetch(key, version) is not MISSING
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        envelope, timeout = self._envelope(value, timeout)
+        self.shared.set(key, envelope, timeout, version=version)
+        self._local_set(self.make_key(key, version), envelope)
+        self.shared.delete(self._lock_key(key), version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        envelopes = {}
+        for key, value in data.items():
+            envelopes[key], backend_timeout = self._envelope(value, timeout)
+            self._local_set(self.make_key(key, version), envelopes[key])
+        return self.shared.set_many(
+            envelopes, backend_timeout, version=version
+        ) if envelopes else []
+
+    def _is_stale(self, envelope):
+        return (envelope is not None and envelope[1] is not None
+                and envelope[1] <= time.time())
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """add, для которого устаревшая запись считается отсутствующей."""
+        envelope, backend_timeout = self._envelope(value, timeout)
+        if self.shared.add(key, envelope, backend_timeout, version=version):
+            self._local_set(self.make_key(key, version), envelope)
+            return True
+        if self._is_stale(self.shared.get(key, version=version)):
+            self.set(key, value, timeout, version=version)
+            return True
+        return False
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """Пересчитанное значение записывается и возвращается.
+
+        Базовая версия делает add() и перечитывает ключ, а тут победитель
+        блокировки пересчёта получил бы обратно устаревшую копию.
+        """
+        value = self._fetch(key, version)
+        if value is MISSING:
+            value = default() if callable(default) else default
+            if value is not None:
+                self.set(key, value, timeout, version=version)
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self.get(key, version=version)
+        if value is None:
+            return False
+        self.set(key, value, timeout, version=version)
+        return True
+
+    def delete(self, key, version=None):
+        self._local_delete(self.make_key(key, version))
+        self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._local_delete(self.make_key(key, version))
+        self.shared.delete_many(keys, version=version)
+
+    def evict_local(self, keys, version=None):
+        """Сбрасывает ключи из памяти процесса, не трогая общий кэш."""
+        for key in keys:
+            self._local_delete(self.make_key(key, version))
+        if isinstance(self.shared, LocMemCache):
+            self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+
+class SQLiteCache(BaseCache):
+    """Общий для процессов хоста кэш в WAL-файле SQLite с mmap.
+
+    Целые числа хранятся как INTEGER, поэтому incr/decr атомарны и
+    выполняются одним UPDATE. Остальные значения хранятся в pickle.
+    Размер ограничен MAX_ENTRIES: при переполнении удаляются просроченные
+    записи, затем записи с ближайшим сроком истечения.
+
+    LOCATION — путь к файлу. OPTIONS: MAX_ENTRIES, CULL_FREQUENCY,
+    MMAP_SIZE, CULL_EVERY — раз в сколько записей проверять размер.
+    """
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.path = location
+        self.mmap_size = int(options.get('MMAP_SIZE', 64 * 1024 * 1024))
+        self.cull_every = int(options.get('CULL_EVERY', 100))
+        self._local = threading.local()
+        self._writes = 0
+
+    @property
+    def connection(self):
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = OFF')
+            conn.execute(f'PRAGMA mmap_size = {self.mmap_size}')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value, expires REAL)'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)'
+            )
+            self._local.connection = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self.connection
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _encode(self, value):
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _decode(self, value):
+        if isinstance(value, bytes):
+            return pickle.loads(value)
+        return value
+
+    def _expires(self, timeout):
+        return self.get_backend_timeout(timeout)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def get(self, key, default=None, version=None):
+        row = self.connection.execute(
+            'SELECT value FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self._key(key, version), time.time()),
+        ).fetchone()
+        return default if row is None else self._decode(row[0])
+
+    def get_many(self, keys, version=None):
+        keys_map = {self._key(key, version): key for key in keys}
+        if not keys_map:
+            return {}
+        placeholders = ', '.join('?' * len(keys_map))
+        rows = self.connection.execute(
+            f'SELECT key, value FROM cache WHERE key IN ({placeholders}) '
+            'AND (expires IS NULL OR expires > ?)',
+            (*keys_map, time.time()),
+        )
+        return {keys_map[key]: self._decode(value) for key, value in rows}
+
+    def has_key(self, key, version=None):
+        return self.connection.execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self._key(key, version), time.time()),
+        ).fetchone() is not None
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self._expires(timeout)
+        rows = [
+            (self._key(key, version), self._encode(value), expires)
+            for key, value in data.items()
+        ]
+        with self._transaction() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires) '
+                'VALUES (?, ?, ?)',
+                rows,
+            )
+        self._maybe_cull(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction() as conn:
+            conn.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                (key, time.time()),
+            )
+            added = conn.execute(
+                'INSERT OR IGNORE INTO cache (key, value, expires) '
+                'VALUES (?, ?, ?)',
+                (key, self._encode(value), self._expires(timeout)),
+            ).rowcount == 1
+        if added:
+            self._maybe_cull(1)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE cache SET value = value + ? WHERE key = ? "
+                "AND typeof(value) = 'integer' "
+                "AND (expires IS NULL OR expires > ?)",
+                (delta, key, time.time()),
+            ).rowcount
+            row = conn.execute(
+                'SELECT value FROM cache WHERE key = ?', (key,)
+            ).fetchone() if updated else None
+        if row is None:
+            raise ValueError(f"Key '{key}' not found")
+        return row[0]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.connection.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self._expires(timeout), self._key(key, version), time.time()),
+        ).rowcount == 1
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version)
+
+    def delete_many(self, keys, version=None):
+        with self._transaction() as conn:
+            conn.executemany(
+                'DELETE FROM cache WHERE key = ?',
+                [(self._key(key, version),) for key in keys],
+            )
+
+    def clear(self):
+        self.connection.execute('DELETE FROM cache')
+
+    def _maybe_cull(self, written):
+        self._writes += written
+        if self._writes < self.cull_every:
+            return
+        self._writes = 0
+        conn = self.connection
+        conn.execute(
+            'DELETE FROM cache WHERE expires <= ?', (time.time(),)
+        )
+        count = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self._max_entries:
+            excess = count - self._max_entries
+            if self._cull_frequency:
+                excess += count // self._cull_frequency
+            conn.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY expires IS NULL, expires LIMIT ?)',
+                (excess,),
+            )
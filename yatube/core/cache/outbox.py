@@ -0,0 +1,92 @@
+"""Журнал инвалидаций кэша между процессами.
+
+Писатель после коммита добавляет в таблицу ключи, которые надо сбросить;
+каждый процесс не чаще раза в CACHE_OUTBOX_POLL_INTERVAL секунд читает
+новые записи и вычищает эти ключи из своей памяти. Свои же записи
+процесс пропускает: у себя он сбросил кэш сразу.
+
+Метка процесса считается лениво и заново после fork: воркеры, которые
+сервер породил из одного загруженного приложения, не делят её.
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.models import CacheInvalidation
+
+PRUNE_EVERY = 1000
+
+_state = {'last_id': None, 'polled_at': 0.0, 'published': 0}
+_lock = threading.Lock()
+_origin = {'pid': None, 'value': None}
+
+
+def origin():
+    """Метка текущего процесса в журнале инвалидаций."""
+    pid = os.getpid()
+    if _origin['pid'] != pid:
+        _origin.update(pid=pid, value=uuid.uuid4().hex)
+    return _origin['value']
+
+
+def publish(keys):
+    """Сообщает остальным процессам о ключах после коммита."""
+    keys = list(keys)
+
+    own = origin()
+
+    def write():
+        entries = CacheInvalidation.objects.using(DEFAULT_DB_ALIAS)
+        entries.bulk_create(
+            CacheInvalidation(key=key, origin=own) for key in keys
+        )
+        _state['published'] += 1
+        if _state['published'] % PRUNE_EVERY == 0:
+            entries.filter(created__lt=timezone.now() - timedelta(
+                seconds=settings.CACHE_OUTBOX_RETENTION
+            )).delete()
+
+    if keys:
+        transaction.on_commit(write)
+
+
+def evict_local(keys):
+    evict = getattr(cache, 'evict_local', cache.delete_many)
+    evict(keys)
+
+
+def poll(force=False):
+    """Сбрасывает ключи из записей других процессов; вернёт их число."""
+    now = time.monotonic()
+    with _lock:
+        if not force and (
+            now - _state['polled_at'] < settings.CACHE_OUTBOX_POLL_INTERVAL
+        ):
+            return 0
+        _state['polled_at'] = now
+        entries = CacheInvalidation.objects.using(DEFAULT_DB_ALIAS)
+        if _state['last_id'] is None:
+            _state['last_id'] = entries.aggregate(
+                last_id=Max('id')
+            )['last_id'] or 0
+            return 0
+        rows = list(
+            entries.filter(id__gt=_state['last_id'])
+            .order_by('id').values_list('id', 'key', 'origin')
+        )
+        if not rows:
+            return 0
+        _state['last_id'] = rows[-1][0]
+    own = origin()
+    keys = {key for _, key, row_origin in rows if row_origin != own}
+    if keys:
+        evict_local(keys)
+    return len(keys)
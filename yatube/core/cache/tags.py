@@ -0,0 +1,57 @@
+"""Инвалидация кэша по тегам.
+
+У каждого тега (``post:1``, ``author:2``, ``group:3``, ``feed:global``,
+``follow:4``) есть версия в кэше. ``author_info:2`` и ``group_info:3``
+меняются только при правке самого пользователя или группы, а не их
+постов. Версии тегов входят в ключ записи,
+поэтому смена версии делает недоступными только помеченные ею записи.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.utils import make_template_fragment_key
+
+from core.cache import outbox
+
+TAG_PREFIX = 'tag:'
+
+
+def _new_version():
+    return uuid.uuid4().hex[:12]
+
+
+def tag_version_map(*tags):
+    """Версии тегов словарём {тег: версия} за один get_many."""
+    keys = {tag: TAG_PREFIX + str(tag) for tag in tags}
+    versions = cache.get_many(list(keys.values()))
+    missing = {
+        key: _new_version() for key in keys.values() if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {tag: versions[key] for tag, key in keys.items()}
+
+
+def tag_versions(*tags):
+    """Текущие версии тегов одной строкой."""
+    versions = tag_version_map(*tags)
+    return '.'.join(versions[tag] for tag in tags)
+
+
+def bump(*tags):
+    """Сбрасывает все записи, помеченные любым из тегов."""
+    if tags:
+        versions = {TAG_PREFIX + str(tag): _new_version() for tag in tags}
+        cache.set_many(versions, None)
+        outbox.publish(versions)
+
+
+def tagged_key(key, tags):
+    return make_template_fragment_key(key, [tag_versions(*tags)])
+
+
+def get_or_set_tagged(key, tags, default, timeout=DEFAULT_TIMEOUT):
+    """cache.get_or_set с ключом, зависящим от версий тегов."""
+    return cache.get_or_set(tagged_key(key, tags), default, timeout)
@@ -0,0 +1,50 @@
+"""Сжатие ответов brotli или gzip, в том числе потоковых."""
+import gzip
+import zlib
+
+from core.staticfiles import accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding):
+    """Лучшая из поддерживаемых кодировок по заголовку Accept-Encoding."""
+    for coding in accepted_encodings(accept_encoding):
+        if coding in available_encodings():
+            return coding
+    return None
+
+
+def compress(data, coding):
+    if coding == 'br':
+        return brotli.compress(data)
+    return gzip.compress(data, 6)
+
+
+def compress_stream(chunks, coding):
+    """Сжимает поток по кусочкам, сбрасывая буфер после каждого.
+
+    Клиент получает каждый кусок сразу, а не когда накопится окно
+    компрессора — это важно для NDJSON и длинных лент.
+    """
+    if coding == 'br':
+        compressor = brotli.Compressor()
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,44 @@
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+
+def reset_state(pinned=False):
+    _state.pinned = pinned
+    _state.wrote = False
+
+
+def has_written():
+    return getattr(_state, 'wrote', False)
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False) or has_written()
+
+
+class PrimaryReplicaRouter:
+    """Пишет в основную базу, читает с реплик из DATABASE_REPLICAS.
+
+    После записи чтения потока закрепляются за основной базой, чтобы
+    пользователь видел собственные изменения, пока реплика догоняет.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+        if not replicas or is_pinned():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
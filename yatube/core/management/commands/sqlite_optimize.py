@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет статистику планировщика SQLite (ANALYZE, PRAGMA optimize) '
+        'и урезает WAL-журнал. С --interval повторяет обслуживание по '
+        'расписанию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Период повтора в секундах; 0 — выполнить один раз.',
+        )
+        parser.add_argument(
+            '--no-analyze',
+            action='store_false',
+            dest='analyze',
+            help='Не выполнять полный ANALYZE, только PRAGMA optimize.',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            self.stderr.write(f'{connection.alias}: не SQLite, пропускаю.')
+            return
+        while True:
+            self.optimize(connection, options['analyze'])
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def optimize(self, connection, analyze):
+        started = time.monotonic()
+        with connection.cursor() as cursor:
+            if analyze:
+                cursor.execute('ANALYZE')
+            cursor.execute('PRAGMA optimize')
+            cursor.execute('PRAGMA journal_mode')
+            if cursor.fetchone()[0] == 'wal':
+                cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        connection.close_if_unusable_or_obsolete()
+        self.stdout.write(
+            f'{connection.alias}: обслуживание завершено за '
+            f'{time.monotonic() - started:.2f} с'
+        )
@@ -0,0 +1,43 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в файлы реплик из DATABASE_REPLICAS '
+        'через backup API. Заменяет репликацию при локальной проверке '
+        'маршрутизатора чтений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Период повтора в секундах; 0 — выполнить один раз.',
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite.')
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                self.sync(primary, connections[alias])
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def sync(self, primary, replica):
+        replica.close()
+        target = sqlite3.connect(replica.settings_dict['NAME'])
+        try:
+            primary.ensure_connection()
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(f'{replica.alias}: синхронизирована')
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template, TemplateDoesNotExist
+
+from core.templating import get_engine, template_names
+
+
+class Command(BaseCommand):
+    help = (
+        'Для каждого шаблона измеряет время компиляции и рендера с пустым '
+        'контекстом, отсортировав по стоимости компиляции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Сколько раз повторять каждое измерение.',
+        )
+
+    def handle(self, *args, **options):
+        engine = get_engine()
+        iterations = options['iterations']
+        rows = []
+        for name in template_names(engine):
+            source, origin = self.find_source(engine, name)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                template = Template(source, origin, name, engine)
+            compile_ms = (time.perf_counter() - started) * 1000 / iterations
+            try:
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    template.render(Context())
+                render_ms = (
+                    (time.perf_counter() - started) * 1000 / iterations
+                )
+                render = f'{render_ms:8.3f}'
+            except Exception as error:
+                render = f'{"—":>8} ({type(error).__name__})'
+            rows.append((compile_ms, name, render))
+        self.stdout.write(f'{"компиляция, мс":>15} {"рендер, мс":>10}  шаблон')
+        for compile_ms, name, render in sorted(rows, reverse=True):
+            self.stdout.write(f'{compile_ms:15.3f} {render:>10}  {name}')
+
+    def find_source(self, engine, name):
+        for loader in engine.template_loaders:
+            for origin in loader.get_template_sources(name):
+                try:
+                    return loader.get_contents(origin), origin
+                except TemplateDoesNotExist:
+                    continue
+        raise TemplateDoesNotExist(name)
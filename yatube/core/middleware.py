@@ -0,0 +1,124 @@
+import time
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from core import compression, ratelimit
+from core.cache import outbox
+from core.db import routers
+
+PIN_COOKIE = 'primary_pin'
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет пользователя за основной базой после записи.
+
+    Метка хранится в cookie со временем окончания окна
+    REPLICA_PIN_SECONDS, поэтому работает и между процессами.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        routers.reset_state(pinned=pinned_until > time.time())
+        try:
+            response = self.get_response(request)
+            if routers.has_written():
+                pin_seconds = settings.REPLICA_PIN_SECONDS
+                response.set_cookie(
+                    PIN_COOKIE,
+                    str(time.time() + pin_seconds),
+                    max_age=pin_seconds,
+                    httponly=True,
+                    samesite='Lax',
+                )
+        finally:
+            routers.reset_state()
+        return response
+
+
+class CacheOutboxMiddleware:
+    """Перед запросом подтягивает инвалидации из других процессов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        outbox.poll()
+        return self.get_response(request)
+
+
+class CompressionMiddleware:
+    """Сжимает ответы brotli или gzip по Accept-Encoding.
+
+    Ответы меньше COMPRESS_MIN_SIZE, других типов или уже сжатые
+    отдаются как есть. Потоковые ответы сжимаются по кусочкам. Сильный
+    ETag становится слабым, поэтому ConditionalGetMiddleware, стоящий
+    ниже, по-прежнему отвечает 304 на If-None-Match от сжатой версии.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if (
+            content_type not in settings.COMPRESS_CONTENT_TYPES
+            or response.has_header('Content-Encoding')
+            or 'no-transform' in response.get('Cache-Control', '')
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = compression.choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if coding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compression.compress_stream(
+                response.streaming_content, coding
+            )
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESS_MIN_SIZE:
+                return response
+            compressed = compression.compress(response.content, coding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag', '')
+        if etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = coding
+        return response
+
+
+class RateLimitMiddleware:
+    """Лимиты RATELIMITS по имени view из resolver_match или декоратора.
+
+    Стоит сразу после SessionMiddleware: его process_view выполняется
+    раньше CsrfViewMiddleware, так что отклонённый запрос не разбирается
+    и не доходит до базы.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        retry_after = ratelimit.check(
+            request, request.resolver_match.view_name,
+            getattr(view_func, 'ratelimit', None),
+        )
+        if retry_after:
+            return ratelimit.too_many_requests(request, retry_after)
+        return None
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheInvalidation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=250, verbose_name='Ключ кэша')),
+                ('origin', models.CharField(max_length=32, verbose_name='Процесс-источник')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата записи')),
+            ],
+        ),
+    ]
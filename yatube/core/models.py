@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class CacheInvalidation(models.Model):
+    """Запись журнала сброса кэша для остальных процессов."""
+    key = models.CharField(
+        max_length=250,
+        verbose_name='Ключ кэша',
+    )
+    origin = models.CharField(
+        max_length=32,
+        verbose_name='Процесс-источник',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата записи',
+    )
@@ -0,0 +1,109 @@
+"""Кэш целых страниц с «дырками» под персональные фрагменты.
+
+Страница рендерится один раз с метками ``<!--hole:шаблон?параметры-->``
+вместо фрагментов, зависящих от пользователя (шапка, форма комментария,
+кнопка подписки). При выдаче метки заменяются свежим рендером этих
+шаблонов с контекстом текущего запроса. Для анонимов без CSRF-формы
+хранится и готовая страница, которая отдаётся вообще без шаблонов.
+"""
+import hashlib
+import re
+from functools import wraps
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+from core.cache.tags import tag_versions
+
+HOLE_RE = re.compile(r'<!--hole:([\w/.-]+)\?([^>]*?)-->')
+
+
+def hole_placeholder(template_name, params):
+    return f'<!--hole:{template_name}?{urlencode(params)}-->'
+
+
+def render_hole(request, template_name, params):
+    return render_to_string(template_name, params, request=request)
+
+
+def fill_holes(content, request):
+    rendered = {}
+
+    def replace(match):
+        placeholder = match.group(0)
+        if placeholder not in rendered:
+            rendered[placeholder] = render_hole(
+                request, match.group(1), dict(parse_qsl(match.group(2)))
+            )
+        return rendered[placeholder]
+
+    return HOLE_RE.sub(replace, content)
+
+
+def add_cache_tags(request, *tags):
+    """Помечает кэшируемую страницу тегами инвалидации.
+
+    Версии снимаются сразу, до чтения данных, чтобы изменение во время
+    рендера не сохранилось под новой версией.
+    """
+    if not hasattr(request, 'cache_tags'):
+        request.cache_tags = []
+        request.cache_versions = []
+    request.cache_tags.extend(tags)
+    request.cache_versions.append(tag_versions(*tags))
+
+
+def page_cache_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'page:{path}'
+
+
+def cache_page_with_holes(view):
+    """Кэширует GET-ответы view на PAGE_CACHE_TIMEOUT секунд."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        key = page_cache_key(request)
+        anonymous = not request.user.is_authenticated
+        entry = cache.get(key)
+        if entry and '.'.join(entry['versions']) == tag_versions(
+            *entry['tags']
+        ):
+            if anonymous and entry['anonymous'] is not None:
+                content = entry['anonymous']
+            else:
+                content = fill_holes(entry['content'], request)
+            return HttpResponse(content, content_type=entry['content_type'])
+
+        request.page_cache_holes = True
+        try:
+            response = view(request, *args, **kwargs)
+        finally:
+            request.page_cache_holes = False
+        if response.streaming or 'text/html' not in response.get(
+            'Content-Type', ''
+        ):
+            return response
+        content = response.content.decode(response.charset)
+        response.content = fill_holes(content, request)
+        tags = getattr(request, 'cache_tags', [])
+        if response.status_code == 200 and tags and not response.cookies:
+            cache.set(key, {
+                'content': content,
+                'content_type': response['Content-Type'],
+                'tags': tags,
+                'versions': request.cache_versions,
+                'anonymous': (
+                    response.content.decode(response.charset)
+                    if anonymous and not request.META.get('CSRF_COOKIE_USED')
+                    else None
+                ),
+            }, settings.PAGE_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
@@ -0,0 +1,121 @@
+"""Ограничение частоты пишущих запросов.
+
+Для view из RATELIMITS заводятся token bucket на IP и на пользователя.
+Ведро — одно целое число в кэше RATELIMIT_CACHE: момент в миллисекундах,
+к которому оно снова наполнится (GCRA). Запрос атомарно прибавляет
+к нему интервал одного токена; если ведро ушло в минус больше чем на
+весь объём, запрос отклоняется, а токены, уже взятые из других вёдер
+этого запроса, возвращаются.
+
+Лимит задаётся рядом с view декоратором ``@ratelimit(ip=..., user=...)``
+или в RATELIMITS по имени view; запись в настройках заменяет декоратор.
+Проверяет core.middleware.RateLimitMiddleware сразу после сессий, до
+CSRF и разбора тела запроса, и до запросов к базе: id пользователя
+берётся прямо из сессии.
+"""
+import math
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.shortcuts import render
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+DEFAULT_METHODS = ('POST',)
+
+# capacity — объём ведра, interval — миллисекунд на один токен.
+Rate = namedtuple('Rate', 'capacity interval')
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'10/m' -> Rate(10, 6000); период можно задать и в секундах: '10/30'."""
+    count, _, period = rate.partition('/')
+    seconds = PERIODS[period] if period in PERIODS else int(period)
+    return Rate(int(count), seconds * 1000 // int(count))
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def consume(key, rate):
+    """Берёт токен из ведра; вернёт 0 или секунды до следующего токена."""
+    cache = caches[settings.RATELIMIT_CACHE]
+    now = now_ms()
+    if cache.add(key, now + rate.interval, rate.interval // 1000 + 1):
+        return 0
+    try:
+        full_at = cache.incr(key, rate.interval)
+    except ValueError:
+        # Ведро истекло между add и incr, то есть оно полное.
+        cache.set(key, now + rate.interval, rate.interval // 1000 + 1)
+        return 0
+    if full_at - rate.interval < now:
+        # Ведро наполнилось раньше срока жизни ключа: отсчёт от сейчас.
+        full_at = cache.incr(key, now - (full_at - rate.interval))
+    excess = full_at - now - rate.capacity * rate.interval
+    if excess > 0:
+        refund(key, rate)
+        return math.ceil(excess / 1000)
+    cache.touch(key, (full_at - now) // 1000 + 1)
+    return 0
+
+
+def refund(key, rate):
+    """Возвращает в ведро взятый токен."""
+    try:
+        caches[settings.RATELIMIT_CACHE].incr(key, -rate.interval)
+    except ValueError:
+        # Ключ истёк: ведро и так полное.
+        pass
+
+
+def identities(request):
+    yield 'ip', request.META.get('REMOTE_ADDR', '')
+    session = getattr(request, 'session', None)
+    user_id = session.get(SESSION_KEY) if session is not None else None
+    if user_id is not None:
+        yield 'user', user_id
+
+
+def ratelimit(**config):
+    """Объявляет лимит view; сама проверка — в RateLimitMiddleware."""
+    def decorator(view):
+        view.ratelimit = config
+        return view
+    return decorator
+
+
+def check(request, name, default=None):
+    """Секунды до повтора, если запрос к view name превышает лимит, иначе 0.
+
+    default — конфиг из декоратора ratelimit, если view нет в RATELIMITS.
+    """
+    config = settings.RATELIMITS.get(name, default)
+    if config is None or request.method not in config.get(
+        'methods', DEFAULT_METHODS
+    ):
+        return 0
+    taken = []
+    for kind, identity in identities(request):
+        if kind not in config:
+            continue
+        key = f'ratelimit:{name}:{kind}:{identity}'
+        rate = parse_rate(config[kind])
+        retry_after = consume(key, rate)
+        if retry_after:
+            for key, rate in taken:
+                refund(key, rate)
+            return retry_after
+        taken.append((key, rate))
+    return 0
+
+
+def too_many_requests(request, retry_after):
+    response = render(request, 'core/429.html', status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
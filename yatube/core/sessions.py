@@ -0,0 +1,88 @@
+"""Сессии в кэше с отложенной записью в базу.
+
+Новые сессии и смена пользователя сессии (вход, выход) сразу пишутся
+в базу. Прочие изменения попадают только в кэш, а рядом в метке сессии
+запоминается, с какого момента база отстаёт. Как только отставание
+дольше SESSION_WRITE_BEHIND_SECONDS, сессия пишется в базу при следующем
+сохранении или чтении, так что частые правки сливаются в одну запись.
+
+Потерять можно только правки, которые кэш вытеснил раньше, чем сессию
+снова открыли, — то есть не больше окна отложенной записи. Если пропала
+сама метка, база могла отстать, и сессия сразу пишется целиком.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY)
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+AUTH_KEYS = (SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY)
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = 'core.sessions'
+
+    @property
+    def state_key(self):
+        return f'{self.cache_key}:state'
+
+    def _auth_state(self):
+        return [self._session.get(key) for key in AUTH_KEYS]
+
+    def _overdue(self, state):
+        dirty_since = state['dirty_since']
+        return (dirty_since is not None and time.time() - dirty_since
+                >= settings.SESSION_WRITE_BEHIND_SECONDS)
+
+    def _write_through(self, must_create=False):
+        super().save(must_create)
+        self._cache.set(
+            self.state_key,
+            {'auth': self._auth_state(), 'dirty_since': None},
+            self.get_expiry_age(),
+        )
+
+    def load(self):
+        data = super().load()
+        if self.session_key is not None and data:
+            state = self._cache.get(self.state_key)
+            if state is not None and self._overdue(state):
+                self._session_cache = data
+                self._write_through()
+        return data
+
+    def save(self, must_create=False):
+        state = None
+        if not must_create and self.session_key is not None:
+            state = self._cache.get(self.state_key)
+        if (state is None or state['auth'] != self._auth_state()
+                or self._overdue(state)):
+            self._write_through(must_create)
+            return
+        self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+        if state['dirty_since'] is None:
+            state['dirty_since'] = time.time()
+            self._cache.set(self.state_key, state, self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        super().delete(session_key)
+        if key is not None:
+            self._cache.delete(f'{self.cache_key_prefix}{key}:state')
+
+
+def delete_user_sessions(user_ids):
+    """Удаляет из базы и кэша живые сессии этих пользователей.
+
+    Пользователь сессии меняется только с записью в базу, поэтому
+    строк таблицы хватает, чтобы найти все его сессии.
+    """
+    user_ids = {str(user_id) for user_id in user_ids}
+    store = SessionStore()
+    sessions = Session.objects.filter(expire_date__gt=timezone.now())
+    for session in sessions.iterator():
+        if str(session.get_decoded().get(SESSION_KEY)) in user_ids:
+            store.delete(session.session_key)
@@ -0,0 +1,191 @@
+"""Статика с хешем в имени, заранее сжатая и отдаваемая из WSGI.
+
+collectstatic через CompressedManifestStaticFilesStorage кладёт в
+STATIC_ROOT файлы вида ``logo.3f2a1b.png`` и рядом для текстовых
+форматов ``.gz`` и ``.br`` (если установлен brotli). StaticFilesApplication
+отдаёт их до Django: выбирает вариант по Accept-Encoding, передаёт файл
+через wsgi.file_wrapper (sendfile у большинства серверов) и ставит
+годовой Cache-Control на файлы с хешем.
+"""
+import gzip
+import json
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico',
+)
+MIN_COMPRESS_SIZE = 256
+# Порядок предпочтения при равных q в Accept-Encoding.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=60'
+BLOCK_SIZE = 64 * 1024
+
+
+def compress_variants(data):
+    """Сжатые варианты содержимого, которые оказались меньше оригинала."""
+    variants = {'.gz': gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data)
+    return {
+        suffix: compressed
+        for suffix, compressed in variants.items()
+        if len(compressed) < len(data)
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage, который дописывает .gz и .br файлы."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = set()
+        for name, hashed_name, done in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(done, Exception):
+                processed.update((name, hashed_name))
+            yield name, hashed_name, done
+        if dry_run:
+            return
+        for name in sorted(processed):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        for suffix, compressed in compress_variants(data).items():
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding с q > 0 в порядке предпочтения."""
+    weights = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        match = re.search(r'q\s*=\s*([\d.]+)', params)
+        try:
+            weights[coding] = float(match.group(1)) if match else 1.0
+        except ValueError:
+            weights[coding] = 0.0
+    order = [coding for coding, _ in ENCODINGS]
+    return sorted(
+        (
+            coding for coding in order
+            if weights.get(coding, weights.get('*', 0)) > 0
+        ),
+        key=lambda coding: -weights.get(coding, weights.get('*', 0)),
+    )
+
+
+def read_blocks(file):
+    with file:
+        yield from iter(lambda: file.read(BLOCK_SIZE), b'')
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.cache_control = (
+            IMMUTABLE_CACHE_CONTROL if immutable else DEFAULT_CACHE_CONTROL
+        )
+        self.variants = {}
+        for coding, suffix in (*ENCODINGS, (None, '')):
+            if os.path.isfile(path + suffix):
+                stat = os.stat(path + suffix)
+                self.variants[coding] = (
+                    path + suffix,
+                    stat.st_size,
+                    f'"{int(stat.st_mtime):x}-{stat.st_size:x}"',
+                    formatdate(stat.st_mtime, usegmt=True),
+                )
+
+    def choose(self, accept_encoding):
+        for coding in accepted_encodings(accept_encoding):
+            if coding in self.variants:
+                return coding
+        return None
+
+
+class StaticFilesApplication:
+    """WSGI-обёртка, отдающая собранную статику из STATIC_ROOT.
+
+    Список файлов читается один раз при старте; всё, что не найдено,
+    уходит в обёрнутое приложение.
+    """
+
+    def __init__(self, application, root, prefix):
+        self.application = application
+        self.prefix = '/' + prefix.strip('/') + '/'
+        self.files = self.scan(root) if root and os.path.isdir(root) else {}
+
+    def scan(self, root):
+        manifest_path = os.path.join(
+            root, ManifestStaticFilesStorage.manifest_name
+        )
+        hashed = set()
+        if os.path.isfile(manifest_path):
+            with open(manifest_path) as manifest:
+                hashed = set(json.load(manifest).get('paths', {}).values())
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(suffixes):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                files[self.prefix + name] = StaticFile(path, name in hashed)
+        return files
+
+    def __call__(self, environ, start_response):
+        static_file = self.files.get(environ.get('PATH_INFO', ''))
+        if static_file is None:
+            return self.application(environ, start_response)
+        method = environ['REQUEST_METHOD']
+        if method not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed', [('Allow', 'GET, HEAD')])
+            return []
+        coding = static_file.choose(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        path, size, etag, last_modified = static_file.variants[coding]
+        headers = [
+            ('Content-Type', static_file.content_type),
+            ('Cache-Control', static_file.cache_control),
+            ('ETag', etag),
+            ('Last-Modified', last_modified),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if coding:
+            headers.append(('Content-Encoding', coding))
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH', '')
+        if etag in if_none_match or if_none_match.strip() == '*':
+            start_response('304 Not Modified', headers)
+            return []
+        headers.append(('Content-Length', str(size)))
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            return []
+        file = open(path, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(file, BLOCK_SIZE)
+        return read_blocks(file)
@@ -0,0 +1,23 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core import page_cache
+from core.cache import tags
+
+register = template.Library()
+
+
+@register.simple_tag
+def tag_versions(*names):
+    """Версии тегов для vary_on в {% cache %}."""
+    return tags.tag_versions(*names)
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, template_name, **params):
+    """Персональный фрагмент страницы, не попадающий в кэш страницы."""
+    request = context.get('request')
+    params = {key: str(value) for key, value in params.items()}
+    if getattr(request, 'page_cache_holes', False):
+        return mark_safe(page_cache.hole_placeholder(template_name, params))
+    return mark_safe(page_cache.render_hole(request, template_name, params))
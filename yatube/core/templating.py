@@ -0,0 +1,38 @@
+"""Прогрев и профилирование шаблонов."""
+import os
+
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+
+
+def get_engine():
+    return engines['django'].engine
+
+
+def template_names(engine=None):
+    """Имена всех шаблонов из DIRS и каталогов templates приложений."""
+    engine = engine or get_engine()
+    dirs = [*engine.dirs, *get_app_template_dirs('templates')]
+    names = set()
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(('.html', '.txt', '.xml')):
+                    path = os.path.join(root, filename)
+                    names.add(
+                        os.path.relpath(path, directory).replace(os.sep, '/')
+                    )
+    return sorted(names)
+
+
+def warm_up():
+    """Компилирует все шаблоны, чтобы их закэшировал cached.Loader.
+
+    Включаемые через {% include %} шаблоны лежат в тех же каталогах,
+    поэтому тоже попадают в кэш до первого запроса.
+    """
+    engine = get_engine()
+    names = template_names(engine)
+    for name in names:
+        engine.get_template(name)
+    return names
@@ -0,0 +1,95 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.test import TestCase
+
+from core.auth import CachedModelBackend
+from core.sessions import SessionStore
+from posts.models import User
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        self.backend = CachedModelBackend()
+
+    def test_user_served_from_cache(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    def test_deactivation_invalidates_cached_user(self):
+        self.backend.get_user(self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+
+class WriteBehindSessionTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+
+    def test_repeated_saves_coalesced(self):
+        """Новая сессия пишется в базу, правки следом — только в кэш."""
+        session = SessionStore()
+        session['step'] = 1
+        session.save()
+        session['step'] = 2
+        with self.assertNumQueries(0):
+            session.save()
+        self.assertEqual(SessionStore(session.session_key)['step'], 2)
+        stored = Session.objects.get(session_key=session.session_key)
+        self.assertEqual(stored.get_decoded()['step'], 1)
+
+    def stored_step(self, session):
+        stored = Session.objects.get(session_key=session.session_key)
+        return stored.get_decoded()['step']
+
+    def test_overdue_changes_written_on_save(self):
+        """Правка из кэша попадает в базу, когда окно записи истекло."""
+        session = SessionStore()
+        session['step'] = 1
+        session.save()
+        session['step'] = 2
+        session.save()
+        later = time.time() + settings.SESSION_WRITE_BEHIND_SECONDS
+        with mock.patch('core.sessions.time.time', return_value=later):
+            session['step'] = 3
+            session.save()
+        self.assertEqual(self.stored_step(session), 3)
+
+    def test_overdue_changes_written_on_load(self):
+        session = SessionStore()
+        session['step'] = 1
+        session.save()
+        session['step'] = 2
+        session.save()
+        later = time.time() + settings.SESSION_WRITE_BEHIND_SECONDS
+        with mock.patch('core.sessions.time.time', return_value=later):
+            self.assertEqual(SessionStore(session.session_key)['step'], 2)
+        self.assertEqual(self.stored_step(session), 2)
+
+    def test_lost_state_writes_through(self):
+        session = SessionStore()
+        session['step'] = 1
+        session.save()
+        caches['shared'].delete(session.state_key)
+        session['step'] = 2
+        session.save()
+        self.assertEqual(self.stored_step(session), 2)
+
+    def test_delete_removes_session(self):
+        session = SessionStore()
+        session['step'] = 1
+        session.save()
+        session.delete()
+        self.assertFalse(SessionStore().exists(session.session_key))
@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from core.cache.backends import SQLiteCache
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = caches['default']
+        self.cache.clear()
+
+    def tearDown(self):
+        self.cache.clear()
+
+    def test_tests_use_own_shared_cache_file(self):
+        """clear() в тестах не трогает рабочий кэш и сессии."""
+        self.assertNotEqual(
+            os.path.dirname(caches['shared'].path), settings.BASE_DIR
+        )
+
+    def test_local_tier_serves_without_shared_backend(self):
+        self.cache.set('key', 'value', 30)
+        with mock.patch.object(
+            caches['shared'], 'get', side_effect=AssertionError
+        ):
+            self.assertEqual(self.cache.get('key'), 'value')
+
+    def test_single_regeneration_of_expired_value(self):
+        """После истечения пересчёт получает один клиент, другие — копию."""
+        self.cache.set('fragment', 'old', 10)
+        later = time.time() + 11
+        with mock.patch('core.cache.backends.time.time', return_value=later):
+            self.assertIsNone(self.cache.get('fragment'))
+            self.assertEqual(self.cache.get('fragment'), 'old')
+            self.cache.set('fragment', 'new', 10)
+        self.assertEqual(self.cache.get('fragment'), 'new')
+
+    def test_get_or_set_replaces_expired_value(self):
+        """Пересчёт после истечения попадает в кэш, а не теряется."""
+        self.cache.set('count', 'old', 10)
+        later = time.time() + 11
+        with mock.patch('core.cache.backends.time.time', return_value=later):
+            value = self.cache.get_or_set('count', lambda: 'new', 10)
+            self.assertEqual(value, 'new')
+            self.assertEqual(self.cache.get('count'), 'new')
+            self.assertFalse(self.cache.add('count', 'newer', 10))
+
+    def test_add_over_expired_value(self):
+        self.cache.set('key', 'old', 10)
+        later = time.time() + 11
+        with mock.patch('core.cache.backends.time.time', return_value=later):
+            self.assertTrue(self.cache.add('key', 'new', 10))
+            self.assertEqual(self.cache.get('key'), 'new')
+
+    def test_get_many(self):
+        self.cache.set_many({'a': 1, 'b': 2}, 30)
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2}
+        )
+
+    def test_delete(self):
+        self.cache.set('key', 'value', 30)
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = SQLiteCache(
+            os.path.join(self.directory, 'cache.sqlite3'),
+            {'OPTIONS': {'MAX_ENTRIES': 10, 'CULL_EVERY': 1}},
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_set_get_many(self):
+        self.cache.set_many({'a': 1, 'b': {'text': 'пост'}}, 30)
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c']),
+            {'a': 1, 'b': {'text': 'пост'}},
+        )
+
+    def test_expired_value_missing(self):
+        self.cache.set('key', 'value', 30)
+        with mock.patch(
+            'core.cache.backends.time.time', return_value=time.time() + 31
+        ):
+            self.assertIsNone(self.cache.get('key'))
+            self.assertTrue(self.cache.add('key', 'new', 30))
+
+    def test_incr_is_atomic_across_threads(self):
+        """Параллельные incr не теряют приращений."""
+        self.cache.set('counter', 0, 30)
+
+        def work():
+            for _ in range(50):
+                self.cache.incr('counter')
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.get('counter'), 200)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_size_bounded(self):
+        for index in range(30):
+            self.cache.set(f'key{index}', index, 30 + index)
+        count = self.cache.connection.execute(
+            'SELECT COUNT(*) FROM cache'
+        ).fetchone()[0]
+        self.assertLessEqual(count, 10)
+        self.assertEqual(self.cache.get('key29'), 29)
@@ -0,0 +1,91 @@
+import gzip
+
+import brotli
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from core.compression import compress_stream
+from core.middleware import CompressionMiddleware
+from posts.models import Post, User
+
+
+class CompressionMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Длинный текст поста {i} ' * 20)
+            for i in range(10)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def middleware(self, response):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_feed_is_gzipped(self):
+        plain = self.client.get(reverse('posts:index'))
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_feed_prefers_brotli(self):
+        plain = self.client.get(reverse('posts:index'))
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), plain.content)
+
+    def test_conditional_get_with_compressed_etag(self):
+        """Слабый ETag сжатой страницы даёт 304 на повторный запрос."""
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        response = self.client.get(
+            reverse('posts:index'),
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_small_and_foreign_responses_are_skipped(self):
+        cases = (
+            HttpResponse('короткий ответ'),
+            HttpResponse(b'\0' * 4096, content_type='application/zip'),
+        )
+        for response in cases:
+            with self.subTest(content_type=response['Content-Type']):
+                response = self.middleware(response)
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response_is_compressed_incrementally(self):
+        lines = [f'{{"n": {i}}}\n'.encode() for i in range(100)]
+        response = self.middleware(StreamingHttpResponse(
+            iter(lines), content_type='application/x-ndjson'
+        ))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            b''.join(lines),
+        )
+
+    def test_stream_chunks_are_flushed(self):
+        """Каждый входной кусок сразу даёт непустой выход."""
+        for coding in ('gzip', 'br'):
+            with self.subTest(coding=coding):
+                stream = compress_stream(iter([b'first', b'second']), coding)
+                self.assertTrue(next(stream))
+                self.assertTrue(next(stream))
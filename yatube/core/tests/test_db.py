@@ -0,0 +1,29 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+
+class SQLiteBackendTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        """При подключении выполняются PRAGMA из OPTIONS."""
+        pragmas = {
+            'synchronous': 1,
+            'busy_timeout': 5000,
+            'cache_size': -64 * 1024,
+            'temp_store': 2,
+        }
+        for name, expected_value in pragmas.items():
+            with self.subTest(name=name):
+                self.assertEqual(self.pragma(name), expected_value)
+
+    def test_sqlite_optimize_command(self):
+        out = StringIO()
+        call_command('sqlite_optimize', stdout=out)
+        self.assertIn('обслуживание завершено', out.getvalue())
@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.test import TestCase
+
+from core.cache import outbox
+from core.cache.tags import bump, tag_versions
+from core.models import CacheInvalidation
+
+
+class CacheOutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Откат теста освобождает id, поэтому позиция журнала — заново.
+        outbox._state['last_id'] = None
+        outbox.poll(force=True)
+
+    def test_bump_published_on_commit(self):
+        with mock.patch.object(
+            outbox.transaction, 'on_commit', lambda func: func()
+        ):
+            bump('feed:global')
+        self.assertTrue(
+            CacheInvalidation.objects.filter(key='tag:feed:global').exists()
+        )
+
+    def test_poll_evicts_keys_from_other_processes(self):
+        """Запись другого процесса сбрасывает локальную версию тега."""
+        version = tag_versions('feed:global')
+        caches['shared'].set('tag:feed:global', ('other', None), None)
+        CacheInvalidation.objects.create(key='tag:feed:global', origin='other')
+        self.assertEqual(tag_versions('feed:global'), version)
+        self.assertEqual(outbox.poll(force=True), 1)
+        self.assertEqual(tag_versions('feed:global'), 'other')
+
+    def test_poll_skips_own_entries(self):
+        version = tag_versions('feed:global')
+        CacheInvalidation.objects.create(
+            key='tag:feed:global', origin=outbox.origin()
+        )
+        self.assertEqual(outbox.poll(force=True), 0)
+        self.assertEqual(tag_versions('feed:global'), version)
+
+    def test_forked_workers_get_own_origin(self):
+        """Воркер после fork не считает записи родителя своими."""
+        parent = outbox.origin()
+        caches['shared'].set('tag:feed:global', ('other', None), None)
+        CacheInvalidation.objects.create(
+            key='tag:feed:global', origin=parent
+        )
+        with mock.patch.object(outbox.os, 'getpid', return_value=-1):
+            self.assertNotEqual(outbox.origin(), parent)
+            self.assertEqual(outbox.poll(force=True), 1)
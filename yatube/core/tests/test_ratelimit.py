@@ -0,0 +1,111 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core import ratelimit
+from core.middleware import RateLimitMiddleware
+from posts.models import Post, User
+
+RATELIMITS = {
+    'posts:post_create': {'ip': '100/m', 'user': '2/m'},
+    'users:signup': {'ip': '1/h'},
+}
+
+
+@override_settings(RATELIMITS=RATELIMITS)
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate('10/m'), (10, 6000))
+        self.assertEqual(ratelimit.parse_rate('5/30'), (5, 6000))
+
+    def test_bucket_refills(self):
+        rate = ratelimit.parse_rate('2/s')
+        with mock.patch.object(ratelimit, 'now_ms', return_value=10 ** 9):
+            self.assertEqual(ratelimit.consume('bucket', rate), 0)
+            self.assertEqual(ratelimit.consume('bucket', rate), 0)
+            self.assertEqual(ratelimit.consume('bucket', rate), 1)
+        with mock.patch.object(
+            ratelimit, 'now_ms', return_value=10 ** 9 + 500
+        ):
+            self.assertEqual(ratelimit.consume('bucket', rate), 0)
+            self.assertEqual(ratelimit.consume('bucket', rate), 1)
+
+    def test_post_create_rejected_before_view(self):
+        url = reverse('posts:post_create')
+        for i in range(2):
+            self.client.post(url, {'text': f'Пост {i}'})
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {'text': 'Лишний пост'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_rejected_body_not_parsed(self):
+        """Отклонённый запрос не доходит до CSRF и разбора формы."""
+        url = reverse('posts:post_create')
+        for i in range(2):
+            self.client.post(url, {'text': f'Пост {i}'})
+        self.client.handler.enforce_csrf_checks = True
+        with mock.patch(
+            'django.http.request.HttpRequest._load_post_and_files'
+        ) as load_post:
+            response = self.client.post(url, {'text': 'Лишний пост'})
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(load_post.called)
+
+    @override_settings(RATELIMITS={
+        'posts:post_create': {'ip': '3/m', 'user': '1/m'},
+    })
+    def test_ip_token_refunded_when_user_rejected(self):
+        url = reverse('posts:post_create')
+        for i in range(3):
+            self.client.post(url, {'text': f'Пост {i}'})
+        other = Client()
+        other.force_login(User.objects.create_user(username='other'))
+        response = other.post(url, {'text': 'Пост'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_user_bucket_is_per_user(self):
+        url = reverse('posts:post_create')
+        for i in range(3):
+            self.client.post(url, {'text': f'Пост {i}'})
+        other = Client()
+        other.force_login(User.objects.create_user(username='other'))
+        response = other.post(url, {'text': 'Пост'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_signup_limited_by_middleware(self):
+        url = reverse('users:signup')
+        Client().post(url, {})
+        response = Client().post(url, {})
+        self.assertEqual(response.status_code, 429)
+
+    def test_decorator_config_overridden_by_settings(self):
+        @ratelimit.ratelimit(ip='1/h')
+        def view(request):
+            pass
+
+        middleware = RateLimitMiddleware(lambda request: None)
+        request = RequestFactory().post('/')
+        request.resolver_match = mock.Mock(view_name='tests:limited')
+        self.assertIsNone(middleware.process_view(request, view, (), {}))
+        response = middleware.process_view(request, view, (), {})
+        self.assertEqual(response.status_code, 429)
+        with override_settings(RATELIMITS={'tests:limited': {}}):
+            self.assertIsNone(middleware.process_view(request, view, (), {}))
@@ -0,0 +1,45 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.db import routers
+from core.middleware import PIN_COOKIE, ReplicaPinMiddleware
+from posts.models import Post
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        routers.reset_state()
+
+    def tearDown(self):
+        routers.reset_state()
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_reads_pinned_after_write(self):
+        """После записи поток читает свои изменения из основной базы."""
+        self.router.db_for_write(Post)
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_middleware_sets_pin_cookie_after_write(self):
+        def write_view(request):
+            self.router.db_for_write(Post)
+            return HttpResponse()
+
+        request = RequestFactory().post('/')
+        response = ReplicaPinMiddleware(write_view)(request)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertFalse(routers.is_pinned())
+
+    def test_middleware_pins_reads_from_cookie(self):
+        def read_view(request):
+            return HttpResponse(self.router.db_for_read(Post))
+
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_COOKIE] = '9999999999'
+        response = ReplicaPinMiddleware(read_view)(request)
+        self.assertEqual(response.content, b'default')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
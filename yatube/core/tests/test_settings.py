@@ -0,0 +1,34 @@
+import runpy
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from yatube import settings as settings_module
+
+
+def load_settings(debug):
+    with mock.patch.dict('os.environ', {'DJANGO_DEBUG': debug}):
+        return runpy.run_path(settings_module.__file__)
+
+
+class SettingsProfileTests(SimpleTestCase):
+    def test_production_profile(self):
+        """С DJANGO_DEBUG=0 шаблоны кэшируются, а статика хешируется."""
+        profile = load_settings('0')
+        self.assertFalse(profile['DEBUG'])
+        loader, = profile['TEMPLATES'][0]['OPTIONS']['loaders']
+        self.assertEqual(loader[0], 'django.template.loaders.cached.Loader')
+        self.assertEqual(
+            profile['STATICFILES_STORAGE'],
+            'core.staticfiles.CompressedManifestStaticFilesStorage',
+        )
+        self.assertNotIn('TEMPLATE_LOADERS', profile)
+
+    def test_development_profile(self):
+        profile = load_settings('1')
+        self.assertTrue(profile['DEBUG'])
+        self.assertNotIn('STATICFILES_STORAGE', profile)
+        self.assertEqual(profile['TEMPLATES'][0]['OPTIONS']['loaders'], [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ])
@@ -0,0 +1,112 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+import brotli
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from core.staticfiles import (
+    IMMUTABLE_CACHE_CONTROL,
+    CompressedManifestStaticFilesStorage,
+    StaticFilesApplication,
+    accepted_encodings,
+)
+
+CSS = b'body { color: red; }\n' * 100
+
+
+class StaticFilesTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        storage.save('css/site.css', ContentFile(CSS))
+        list(storage.post_process({'css/site.css': (storage, 'css/site.css')}))
+        self.hashed = storage.stored_name('css/site.css')
+        self.app = StaticFilesApplication(
+            self.fallback, self.root, '/static/'
+        )
+
+    def fallback(self, environ, start_response):
+        start_response('404 Not Found', [])
+        return [b'django']
+
+    def request(self, path, **environ):
+        environ.setdefault('REQUEST_METHOD', 'GET')
+        environ['PATH_INFO'] = path
+        result = {}
+
+        def start_response(status, headers):
+            result['status'] = status
+            result['headers'] = dict(headers)
+
+        result['body'] = b''.join(self.app(environ, start_response))
+        return result
+
+    def test_post_process_writes_gzip(self):
+        path = os.path.join(self.root, self.hashed)
+        with open(path + '.gz', 'rb') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), CSS)
+        with open(os.path.join(self.root, 'staticfiles.json')) as manifest:
+            self.assertEqual(
+                json.load(manifest)['paths']['css/site.css'], self.hashed
+            )
+
+    def test_brotli_variant_served(self):
+        path = os.path.join(self.root, self.hashed)
+        with open(path + '.br', 'rb') as compressed:
+            self.assertEqual(brotli.decompress(compressed.read()), CSS)
+        response = self.request(
+            '/static/' + self.hashed, HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        self.assertEqual(response['headers']['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response['body']), CSS)
+
+    def test_hashed_file_is_immutable(self):
+        response = self.request('/static/' + self.hashed)
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(
+            response['headers']['Cache-Control'], IMMUTABLE_CACHE_CONTROL
+        )
+        self.assertEqual(response['headers']['Content-Type'], 'text/css')
+        self.assertEqual(response['body'], CSS)
+
+    def test_gzip_negotiation(self):
+        response = self.request(
+            '/static/' + self.hashed, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(response['headers']['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response['body']), CSS)
+        refused = self.request(
+            '/static/' + self.hashed, HTTP_ACCEPT_ENCODING='gzip;q=0'
+        )
+        self.assertNotIn('Content-Encoding', refused['headers'])
+
+    def test_not_modified(self):
+        etag = self.request('/static/' + self.hashed)['headers']['ETag']
+        response = self.request(
+            '/static/' + self.hashed, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response['status'], '304 Not Modified')
+        self.assertEqual(response['body'], b'')
+
+    def test_unknown_path_falls_through(self):
+        response = self.request('/static/missing.css')
+        self.assertEqual(response['body'], b'django')
+
+    def test_accepted_encodings(self):
+        cases = (
+            ('', []),
+            ('gzip', ['gzip']),
+            ('gzip, br', ['br', 'gzip']),
+            ('br;q=0.5, gzip', ['gzip', 'br']),
+            ('*', ['br', 'gzip']),
+        )
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(accepted_encodings(header), expected)
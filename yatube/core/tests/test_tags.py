@@ -0,0 +1,22 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.cache.tags import bump, get_or_set_tagged, tag_versions
+
+
+class CacheTagsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_changes_only_its_tag(self):
+        post_version = tag_versions('post:1')
+        group_version = tag_versions('group:1')
+        bump('post:1')
+        self.assertNotEqual(tag_versions('post:1'), post_version)
+        self.assertEqual(tag_versions('group:1'), group_version)
+
+    def test_get_or_set_tagged(self):
+        self.assertEqual(get_or_set_tagged('key', ['author:1'], 1), 1)
+        self.assertEqual(get_or_set_tagged('key', ['author:1'], 2), 1)
+        bump('author:1')
+        self.assertEqual(get_or_set_tagged('key', ['author:1'], 3), 3)
@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from core.templating import template_names, warm_up
+
+CACHED_TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'DIRS': engines['django'].engine.dirs,
+    'OPTIONS': {
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}]
+
+
+class TemplatingTests(TestCase):
+    def test_template_names(self):
+        names = template_names()
+        for name in (
+            'base.html',
+            'includes/header.html',
+            'posts/index.html',
+            'posts/includes/paginator.html',
+        ):
+            with self.subTest(name=name):
+                self.assertIn(name, names)
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_warm_up_fills_cached_loader(self):
+        """После прогрева все шаблоны уже в кэше загрузчика."""
+        names = warm_up()
+        loader = engines['django'].engine.template_loaders[0]
+        for name in names:
+            with self.subTest(name=name):
+                self.assertIn(name, loader.get_template_cache)
+
+    def test_template_profile_command(self):
+        out = StringIO()
+        call_command('template_profile', iterations=1, stdout=out)
+        self.assertIn('posts/index.html', out.getvalue())
@@ -1,15 +1,264 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.urls import reverse
+from django.utils.html import format_html
 
-from .models import Group, Post
+from core.cache.tags import get_or_set_tagged
 
+from . import moderation
+from .models import Comment, Follow, Group, ModerationJob, Post, User
+from .utils import ApproximatePaginator
 
-class PostAdmin(admin.ModelAdmin):
+CURSOR_VAR = 'after'
+
+
+def group_choices():
+    """Варианты группы для list_editable, общие для всех строк."""
+    return get_or_set_tagged(
+        'admin_group_choices',
+        ['group:all'],
+        lambda: [('', '---------'), *Group.objects.filter(
+            is_deleted=False
+        ).order_by('title').values_list('pk', 'title')],
+    )
+
+
+class CursorChangeList(ChangeList):
+    """Список объектов, листаемый по pk вместо OFFSET.
+
+    Пока пользователь не выбрал сортировку, страница — это pk меньше
+    ``?after=``: стоимость не растёт с номером страницы. Сами строки
+    выбираются по pk из индекса, поэтому result_list остаётся QuerySet
+    и list_editable работает как обычно.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.after = None
+        if CURSOR_VAR in request.GET:
+            request.GET = request.GET.copy()
+            try:
+                self.after = int(request.GET.pop(CURSOR_VAR)[0])
+            except ValueError:
+                pass
+        super().__init__(request, *args, **kwargs)
+
+    @property
+    def cursor_mode(self):
+        return ORDER_VAR not in self.params and not self.show_all
+
+    def get_results(self, request):
+        if not self.cursor_mode:
+            self.after = self.next_cursor = None
+            return super().get_results(request)
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        queryset = self.queryset
+        if self.after is not None:
+            queryset = queryset.filter(pk__lt=self.after)
+        pks = list(
+            queryset.values_list('pk', flat=True)[:self.list_per_page + 1]
+        )
+        self.next_cursor = None
+        if len(pks) > self.list_per_page:
+            pks = pks[:self.list_per_page]
+            self.next_cursor = pks[-1]
+        self.result_list = self.queryset.filter(pk__in=pks)
+        self.result_count = paginator.count
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = self.after is not None or bool(self.next_cursor)
+        self.paginator = paginator
+        self.first_page_url = self.get_query_string()
+        self.next_page_url = self.get_query_string(
+            {CURSOR_VAR: self.next_cursor}
+        )
+
+
+class ModerationActionForm(ActionForm):
+    group = forms.ChoiceField(
+        required=False,
+        label='Группа',
+        choices=(),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['group'].choices = group_choices()
+
+
+def moderation_action(action, description):
+    """Admin action, ставящий action над выбранными объектами в очередь."""
+
+    def run(modeladmin, request, queryset):
+        params = {}
+        if action == moderation.MOVE:
+            group_id = request.POST.get('group')
+            params['group_id'] = int(group_id) if group_id else None
+        job = moderation.enqueue(queryset, action, request.user, **params)
+        url = reverse('admin:posts_moderationjob_change', args=[job.pk])
+        modeladmin.message_user(
+            request,
+            format_html(
+                'Задача <a href="{}">#{}</a> на {} объектов поставлена в '
+                'очередь.', url, job.pk, job.total,
+            ),
+            messages.SUCCESS,
+        )
+
+    run.__name__ = f'{action}_in_background'
+    run.short_description = description
+    return run
+
+
+delete_in_background = moderation_action(
+    moderation.DELETE, 'Удалить выбранные (в фоне)'
+)
+hide_in_background = moderation_action(
+    moderation.HIDE, 'Скрыть выбранные (в фоне)'
+)
+move_in_background = moderation_action(
+    moderation.MOVE, 'Перенести в группу (в фоне)'
+)
+purge_in_background = moderation_action(
+    moderation.PURGE, 'Удалить выбранные со всеми записями (в фоне)'
+)
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    """Админка для больших таблиц.
+
+    Без полного COUNT(*) (число строк кэшируется под count_tags или
+    оценивается по статистике БД) и с листанием по pk.
+    """
+
+    ordering = ('-pk',)
+    show_full_result_count = False
+    list_per_page = 50
+    count_tags = ()
+    empty_value_display = '-пусто-'
+
+    def get_changelist(self, request, **kwargs):
+        return CursorChangeList
+
+    def get_actions(self, request):
+        # Синхронное удаление грузит все объекты в одном запросе.
+        actions = super().get_actions(request)
+        if self.actions and 'delete_selected' in actions:
+            del actions['delete_selected']
+        return actions
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        return ApproximatePaginator(
+            queryset,
+            per_page,
+            tags=self.count_tags,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+        )
+
+
+class PostAdmin(ScalableAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
-    empty_value_display = '-пусто-'
+    date_hierarchy = 'pub_date'
+    raw_id_fields = ('author',)
+    count_tags = ('feed:global',)
+    action_form = ModerationActionForm
+    actions = (delete_in_background, hide_in_background, move_in_background)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        if db_field.name == 'group':
+            formfield.choices = group_choices()
+        return formfield
+
+
+class CommentAdmin(ScalableAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author', 'post')
+    search_fields = ('text',)
+    list_filter = ('created',)
+    date_hierarchy = 'created'
+    raw_id_fields = ('post', 'author')
+    actions = (delete_in_background, hide_in_background)
+
+
+class FollowAdmin(ScalableAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+
+
+class PurgeOnDeleteMixin:
+    """Удаление из админки — мягкое, с фоновой очисткой.
+
+    И кнопка «Удалить» на странице объекта, и массовое удаление только
+    помечают объекты и ставят задачу purge; страница подтверждения не
+    собирает каскад зависимых записей.
+    """
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, self.model.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        purge_in_background(self, request, queryset)
+
+
+class GroupAdmin(PurgeOnDeleteMixin, admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug', 'is_deleted')
+    list_filter = ('is_deleted',)
+    search_fields = ('title', 'slug')
+    action_form = ModerationActionForm
+    actions = (purge_in_background, hide_in_background, move_in_background)
+
+
+class UserAdmin(PurgeOnDeleteMixin, BaseUserAdmin):
+    actions = (purge_in_background,)
+
+
+class ModerationJobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'action', 'model', 'status', 'progress',
+                    'created_by', 'created', 'updated')
+    list_filter = ('status', 'action', 'model')
+    readonly_fields = ('model', 'action', 'params', 'status', 'progress',
+                       'error', 'created_by', 'created', 'updated')
+    exclude = ('object_ids', 'total', 'processed')
+
+    def progress(self, job):
+        if not job.total:
+            return '—'
+        percent = job.processed * 100 // job.total
+        return f'{job.processed}/{job.total} ({percent}%)'
+    progress.short_description = 'Прогресс'
+
+    def has_add_permission(self, request):
+        return False
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
+admin.site.register(ModerationJob, ModerationJobAdmin)
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
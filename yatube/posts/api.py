@@ -0,0 +1,349 @@
+"""Read-only JSON-версии лент и страницы поста.
+
+Посты читаются теми же лёгкими записями, что и HTML-ленты
+(posts.records), без создания моделей. Страницы листаются курсором
+по (pub_date, id), клиент может запросить только нужные поля:
+``?fields=id,text,author``. ETag
+строится из версий тегов кэша, поэтому на If-None-Match сервер отвечает
+304, не трогая таблицу постов.
+
+``new/`` отвечает, сколько постов появилось после id, который клиент
+видел последним, а ``new/stream/`` присылает то же событиями SSE.
+Оба сначала сверяются с максимальным id ленты в кэше, так что пока
+новых постов нет, база не запрашивается.
+"""
+import base64
+import binascii
+import hashlib
+import json
+import time
+from collections import namedtuple
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Max, Q
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+
+from core.cache import outbox
+from core.cache.tags import get_or_set_tagged, tag_versions
+
+from .models import (
+    ArchivedComment,
+    ArchivedPost,
+    Comment,
+    Group,
+    Post,
+)
+from .purge import get_author_or_404
+from .records import post_records
+from .utils import POST_PAGES, follow_feed_tags
+
+MAX_LIMIT = 100
+# Имя поля в ответе -> значение из PostRecord.
+FIELDS = {
+    'id': lambda post: post.id,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date.isoformat(),
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group.slug if post.group else None,
+    'image': lambda post: (
+        default_storage.url(post.image) if post.image else None
+    ),
+}
+DEFAULT_FIELDS = tuple(FIELDS)
+COMMENT_FIELDS = ('id', 'author__username', 'text', 'created')
+NEW_POSTS_MAX_IDS = 100
+
+Scope = namedtuple('Scope', 'key tags queryset')
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Unauthorized(Exception):
+    pass
+
+
+def encode_cursor(pub_date, post_id):
+    raw = f'{pub_date.isoformat()}|{post_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        pub_date, post_id = raw.decode().split('|')
+        return datetime.fromisoformat(pub_date), int(post_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BadRequest('Некорректный cursor')
+
+
+def requested_fields(request):
+    fields = request.GET.get('fields')
+    if not fields:
+        return DEFAULT_FIELDS
+    names = tuple(name.strip() for name in fields.split(',') if name.strip())
+    unknown = set(names) - set(FIELDS)
+    if unknown:
+        raise BadRequest(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    return names
+
+
+def requested_limit(request):
+    try:
+        limit = int(request.GET.get('limit', POST_PAGES))
+    except ValueError:
+        raise BadRequest('Некорректный limit')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def serialize(post, fields):
+    return {name: FIELDS[name](post) for name in fields}
+
+
+def cursor_page(querysets, fields, cursor, limit):
+    """Страница строк из querysets по порядку, начиная после cursor.
+
+    Несколько querysets нужны профилю: после горячей таблицы идёт архив,
+    в котором все посты старше.
+    """
+    rows = []
+    for queryset in querysets:
+        queryset = queryset.order_by('-pub_date', '-id')
+        if cursor is not None:
+            pub_date, post_id = cursor
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=post_id)
+            )
+        rows.extend(post_records(
+            queryset[:limit + 1 - len(rows)], text='text' in fields
+        ))
+        if len(rows) > limit:
+            break
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].pub_date, rows[-1].id)
+    return {
+        'results': [serialize(row, fields) for row in rows],
+        'next': next_cursor,
+    }
+
+
+def feed_etag(request, tags):
+    key = f'{tag_versions(*tags)}:{request.get_full_path()}'
+    return '"' + hashlib.md5(key.encode()).hexdigest() + '"'
+
+
+def json_view(request, tags, build):
+    """Общая часть API: ETag, 304 и ответ 400 на плохие параметры."""
+    etag = feed_etag(request, tags)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    try:
+        response = JsonResponse(
+            build(), json_dumps_params={'ensure_ascii': False}
+        )
+    except BadRequest as error:
+        return JsonResponse({'detail': str(error)}, status=400)
+    response['ETag'] = etag
+    return response
+
+
+def feed_response(request, tags, *querysets):
+    def build():
+        cursor = request.GET.get('cursor')
+        return cursor_page(
+            querysets,
+            requested_fields(request),
+            decode_cursor(cursor) if cursor else None,
+            requested_limit(request),
+        )
+
+    return json_view(request, tags, build)
+
+
+def index(request):
+    return feed_response(request, ['feed:global'], Post.visible.all())
+
+
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug, is_deleted=False)
+    return feed_response(
+        request, [f'group:{group.pk}'], Post.visible.filter(group=group)
+    )
+
+
+def profile(request, username):
+    author = get_author_or_404(username)
+    return feed_response(
+        request,
+        [f'author:{author.pk}'],
+        Post.visible.filter(author=author),
+        ArchivedPost.visible.filter(author=author),
+    )
+
+
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Требуется авторизация'}, status=401
+        )
+    return feed_response(
+        request,
+        follow_feed_tags(request.user.pk),
+        Post.visible.filter(author__following__user=request.user),
+    )
+
+
+def post_detail(request, post_id):
+    def build():
+        fields = requested_fields(request)
+        for model, comment_model in (
+            (Post, Comment),
+            (ArchivedPost, ArchivedComment),
+        ):
+            posts = post_records(
+                model.visible.filter(pk=post_id), text='text' in fields
+            )
+            if posts:
+                break
+        else:
+            raise Http404
+        data = serialize(posts[0], fields)
+        comments = comment_model.visible.filter(post_id=post_id)
+        data['comments'] = [
+            {
+                'id': comment['id'],
+                'author': comment['author__username'],
+                'text': comment['text'],
+                'created': comment['created'].isoformat(),
+            }
+            for comment in comments.order_by('created').values(
+                *COMMENT_FIELDS
+            )
+        ]
+        return data
+
+    return json_view(request, [f'post:{post_id}'], build)
+
+
+def resolve_scope(request):
+    """Лента из параметров ?scope=global|group|follow и ?slug=."""
+    scope = request.GET.get('scope', 'global')
+    if scope == 'global':
+        return Scope('global', ['feed:global'], Post.visible.all())
+    if scope == 'group':
+        group = get_object_or_404(
+            Group, slug=request.GET.get('slug'), is_deleted=False
+        )
+        return Scope(
+            f'group:{group.pk}',
+            [f'group:{group.pk}'],
+            Post.visible.filter(group=group),
+        )
+    if scope == 'follow':
+        if not request.user.is_authenticated:
+            raise Unauthorized
+        user_id = request.user.pk
+        return Scope(
+            f'follow:{user_id}',
+            follow_feed_tags(user_id),
+            Post.visible.filter(author__following__user_id=user_id),
+        )
+    raise BadRequest('Неизвестный scope')
+
+
+def requested_since(request):
+    since = request.GET.get('since') or request.META.get(
+        'HTTP_LAST_EVENT_ID', 0
+    )
+    try:
+        return int(since)
+    except ValueError:
+        raise BadRequest('Некорректный since')
+
+
+def high_water(scope):
+    """Максимальный id ленты; сбрасывается вместе с тегом ленты."""
+    return get_or_set_tagged(
+        f'high_water:{scope.key}',
+        scope.tags,
+        lambda: scope.queryset.aggregate(Max('id'))['id__max'] or 0,
+    )
+
+
+def new_posts(scope, since):
+    if high_water(scope) <= since:
+        return {'count': 0, 'ids': [], 'last_id': since}
+    newer = scope.queryset.filter(id__gt=since)
+    ids = list(
+        newer.order_by('-id').values_list('id', flat=True)[:NEW_POSTS_MAX_IDS]
+    )
+    count = newer.count() if len(ids) == NEW_POSTS_MAX_IDS else len(ids)
+    return {'count': count, 'ids': ids, 'last_id': ids[0]}
+
+
+def scoped_view(view):
+    @wraps(view)
+    def wrapper(request):
+        try:
+            scope = resolve_scope(request)
+            return view(request, scope, requested_since(request))
+        except BadRequest as error:
+            return JsonResponse({'detail': str(error)}, status=400)
+        except Unauthorized:
+            return JsonResponse(
+                {'detail': 'Требуется авторизация'}, status=401
+            )
+
+    return wrapper
+
+
+@scoped_view
+def new_posts_count(request, scope, since):
+    return JsonResponse(new_posts(scope, since))
+
+
+def new_posts_events(scope, since):
+    """События SSE о новых постах.
+
+    Каждый тик — один поход в кэш, пока high-water не сдвинулся.
+    Комментарий-keepalive на пустых тиках быстро выявляет закрытые
+    соединения, а SSE_MAX_SECONDS ограничивает жизнь потока: браузер
+    переподключится сам и передаст последний id в Last-Event-ID.
+    Поток занимает синхронный воркер целиком, поэтому он короткий —
+    о воркерах см. комментарий к SSE_MAX_SECONDS в настройках.
+    """
+    deadline = time.monotonic() + settings.SSE_MAX_SECONDS
+    yield f'retry: {settings.SSE_RETRY_MS}\n\n'
+    while True:
+        outbox.poll()
+        data = new_posts(scope, since)
+        if data['count']:
+            since = data['last_id']
+            yield (
+                f'id: {since}\nevent: posts\n'
+                f'data: {json.dumps(data)}\n\n'
+            )
+        else:
+            yield ': keepalive\n\n'
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(settings.SSE_POLL_INTERVAL)
+
+
+@scoped_view
+def new_posts_stream(request, scope, since):
+    response = StreamingHttpResponse(
+        new_posts_events(scope, since), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
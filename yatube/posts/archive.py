@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = settings.POSTS_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(cutoff, batch_size):
+    """Переносит в архив пачку самых старых постов вместе с комментариями.
+
+    Каждая пачка — отдельная короткая транзакция. Комментарии переносятся
+    все, скрытые модератором — вместе с флагом ``is_hidden``. Возвращает
+    число перенесённых постов.
+    """
+    with transaction.atomic():
+        posts = list(
+            Post.visible.filter(pub_date__lt=cutoff)
+            .order_by('pub_date')[:batch_size]
+        )
+        if not posts:
+            return 0
+        post_ids = [post.id for post in posts]
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(
+                id=post.id,
+                text=post.text,
+                preview=post.preview,
+                body_html=post.body_html,
+                pub_date=post.pub_date,
+                author_id=post.author_id,
+                group_id=post.group_id,
+                image=post.image.name,
+            )
+            for post in posts
+        )
+        comments = Comment.objects.filter(post_id__in=post_ids)
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(
+                id=comment.id,
+                post_id=comment.post_id,
+                author_id=comment.author_id,
+                text=comment.text,
+                created=comment.created,
+                is_hidden=comment.is_hidden,
+            )
+            for comment in comments
+        )
+        comments.delete()
+        Post.objects.filter(id__in=post_ids).delete()
+    return len(posts)
+
+
+def get_post_or_archived(post_id):
+    """Ищет пост в горячей таблице, затем в архиве."""
+    post = Post.visible.select_related('author', 'group').filter(
+        pk=post_id
+    ).first()
+    if post is None:
+        post = ArchivedPost.visible.select_related('author', 'group').filter(
+            pk=post_id
+        ).first()
+    return post
+
+
+class ArchiveFallthrough:
+    """Горячие посты, за которыми следуют архивные.
+
+    Поддерживает ``count()`` и срезы, поэтому подходит для Paginator:
+    архив запрашивается только для страниц за концом горячей таблицы.
+    """
+
+    def __init__(self, hot, archived):
+        self.hot = hot
+        self.archived = archived
+        self._hot_count = None
+
+    @property
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def count(self):
+        return self.hot_count + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        items = []
+        if start < self.hot_count:
+            items += self.hot[start:min(stop, self.hot_count)]
+        if stop > self.hot_count:
+            items += self.archived[
+                max(start - self.hot_count, 0):stop - self.hot_count
+            ]
+        return items
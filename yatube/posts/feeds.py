@@ -0,0 +1,135 @@
+"""RSS и Atom для общей ленты, групп и авторов.
+
+XML рендерится один раз на изменение ленты: ключ кэша содержит дату
+последнего поста и версию тега ленты (чтобы учесть правки и удаления).
+Условные запросы проверяются только по ETag из того же ключа:
+Last-Modified по дате поста не заметил бы правку, скрытие или удаление.
+В кэше лежит список кусков по FEED_CHUNK_SIZE, и ответ отдаёт их
+потоком, не склеивая в одну строку.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import truncatechars
+from django.urls import reverse
+from django.utils import feedgenerator
+from django.utils.cache import get_conditional_response
+
+from core.cache.tags import tag_versions
+
+from .models import Group, Post
+from .purge import get_author_or_404
+
+FORMATS = {
+    'rss': feedgenerator.Rss201rev2Feed,
+    'atom': feedgenerator.Atom1Feed,
+}
+FEED_CHUNK_SIZE = 16 * 1024
+
+
+class ChunkWriter:
+    """Файлоподобный приёмник, режущий вывод на куски."""
+
+    def __init__(self):
+        self.chunks = []
+        self.buffer = []
+        self.size = 0
+
+    def write(self, data):
+        self.buffer.append(data)
+        self.size += len(data)
+        if self.size >= FEED_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.chunks.append(b''.join(self.buffer))
+            self.buffer = []
+            self.size = 0
+
+
+def build_feed(request, fmt, title, link, queryset):
+    feed = FORMATS[fmt](
+        title=title,
+        link=request.build_absolute_uri(link),
+        description=title,
+        feed_url=request.build_absolute_uri(),
+        language=settings.LANGUAGE_CODE,
+    )
+    posts = queryset.select_related('author', 'group').only(
+        'id', 'text', 'pub_date', 'author__username', 'group__title'
+    )[:settings.FEED_ITEMS]
+    for post in posts.iterator():
+        url = request.build_absolute_uri(
+            reverse('posts:post_detail', args=[post.pk])
+        )
+        feed.add_item(
+            title=truncatechars(post.text, 50),
+            link=url,
+            description=post.text,
+            unique_id=url,
+            pubdate=post.pub_date,
+            author_name=post.author.username,
+            categories=[post.group.title] if post.group else None,
+        )
+    writer = ChunkWriter()
+    feed.write(writer, 'utf-8')
+    writer.flush()
+    return writer.chunks
+
+
+def feed_response(request, fmt, scope, tag, title, link, queryset):
+    if fmt not in FORMATS:
+        raise Http404
+    latest = (
+        queryset.order_by('-pub_date').values_list('pub_date', flat=True)
+        .first()
+    )
+    stamp = latest.timestamp() if latest else 0
+    key = (
+        f'feed:{scope}:{fmt}:{request.get_host()}:{stamp}:'
+        f'{tag_versions(tag)}'
+    )
+    etag = '"' + hashlib.md5(key.encode()).hexdigest() + '"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    chunks = cache.get(key)
+    if chunks is None:
+        chunks = build_feed(request, fmt, title, link, queryset)
+        cache.set(key, chunks, settings.PAGE_CACHE_TIMEOUT)
+    response = StreamingHttpResponse(
+        iter(chunks), content_type=FORMATS[fmt].content_type
+    )
+    response['ETag'] = etag
+    return response
+
+
+def index_feed(request, fmt):
+    return feed_response(
+        request, fmt, 'global', 'feed:global', 'Yatube: последние записи',
+        reverse('posts:index'), Post.visible.all(),
+    )
+
+
+def group_feed(request, fmt, slug):
+    group = get_object_or_404(Group, slug=slug, is_deleted=False)
+    return feed_response(
+        request, fmt, f'group:{group.pk}', f'group:{group.pk}',
+        f'Yatube: {group.title}',
+        reverse('posts:group_list', args=[slug]),
+        Post.visible.filter(group=group),
+    )
+
+
+def profile_feed(request, fmt, username):
+    author = get_author_or_404(username)
+    return feed_response(
+        request, fmt, f'author:{author.pk}', f'author:{author.pk}',
+        f'Yatube: записи {author.get_full_name() or author.username}',
+        reverse('posts:profile', args=[username]),
+        Post.visible.filter(author=author),
+    )
@@ -1,6 +1,6 @@
 from django import forms
 
-from .models import Comment, Post
+from .models import Comment, Group, Post
 
 
 class PostForm(forms.ModelForm):
@@ -13,6 +13,12 @@ class PostForm(forms.ModelForm):
             'image': 'Картинка для поста',
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['group'].queryset = Group.objects.filter(
+            is_deleted=False
+        )
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше POSTS_ARCHIVE_AFTER_DAYS вместе с '
+        'комментариями в архивные таблицы короткими транзакциями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Горизонт архивации в днях.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько постов переносить за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['days'])
+        started = time.monotonic()
+        total = 0
+        while True:
+            moved = archive_batch(cutoff, options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f'Перенесено постов: {total}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Архивировано {total} постов за '
+            f'{time.monotonic() - started:.1f} с'
+        ))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import ArchivedPost, Post, render_text
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет превью и HTML текста у постов, сохранённых до появления '
+        'этих колонок, пачками по pk в коротких транзакциях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько постов обновлять за одну транзакцию.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересчитать все посты, например после смены '
+                 'POST_PREVIEW_LENGTH.',
+        )
+
+    def handle(self, *args, **options):
+        for queryset in (Post.objects.all(), ArchivedPost.objects.all()):
+            if not options['all']:
+                queryset = queryset.filter(body_html='')
+            total = self.backfill(queryset, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{queryset.model.__name__}: обновлено {total}'
+            ))
+
+    def backfill(self, queryset, batch_size):
+        last_pk = 0
+        total = 0
+        while True:
+            with transaction.atomic():
+                posts = list(
+                    queryset.filter(pk__gt=last_pk).order_by('pk')
+                    .only('pk', 'text')[:batch_size]
+                )
+                if not posts:
+                    return total
+                for post in posts:
+                    post.preview, post.body_html = render_text(post.text)
+                queryset.model._base_manager.bulk_update(
+                    posts, ['preview', 'body_html']
+                )
+            last_pk = posts[-1].pk
+            total += len(posts)
@@ -0,0 +1,40 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import FORMATS, SCHEMA, export_rows, write_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает группы, посты, комментарии (вместе с архивом) '
+        'и подписки в каталог: по файлу <модель>.<формат> на модель.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог для выгрузки.')
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из базы за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(options['directory'], exist_ok=True)
+        for name in SCHEMA:
+            path = os.path.join(
+                options['directory'], f'{name}.{options["format"]}'
+            )
+            started = time.monotonic()
+            count = 0
+            with open(path, 'w', newline='', encoding='utf-8') as stream:
+                rows = export_rows(name, options['chunk_size'])
+                for _ in write_rows(stream, options['format'], name, rows):
+                    count += 1
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f'{name}: {count} строк, {count / elapsed:.0f} строк/с'
+            )
@@ -0,0 +1,67 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+
+from posts.models import Post
+from posts.records import post_records
+
+
+def load_models(limit):
+    return list(Post.visible.select_related('author', 'group')[:limit])
+
+
+def load_records(limit):
+    return post_records(Post.visible.all()[:limit])
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает загрузку и рендер карточек страницы ленты из моделей '
+        'Post и из лёгких записей posts.records: время и пик памяти.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='Сколько последних постов загружать за раз.',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Сколько раз повторять каждое измерение.',
+        )
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        iterations = options['iterations']
+        template = get_template('posts/includes/post_card.html')
+        self.stdout.write(
+            f'{"":8} {"загрузка, мс":>13} {"рендер, мс":>11} '
+            f'{"память, КБ":>11}'
+        )
+        for name, load in (('модели', load_models), ('записи', load_records)):
+            posts = load(limit)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                load(limit)
+            load_ms = (time.perf_counter() - started) * 1000 / iterations
+            started = time.perf_counter()
+            for _ in range(iterations):
+                for post in posts:
+                    template.render({'post': post})
+            render_ms = (time.perf_counter() - started) * 1000 / iterations
+            del posts
+            tracemalloc.start()
+            posts = load(limit)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stdout.write(
+                f'{name:8} {load_ms:13.3f} {render_ms:11.3f} '
+                f'{peak / 1024:11.1f}'
+            )
+        self.stdout.write(f'постов на странице: {len(posts)}')
@@ -0,0 +1,43 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import FORMATS, SCHEMA, Importer, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает данные, выгруженные export_posts, пачками '
+        'bulk_create в отдельных транзакциях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог с выгрузкой.')
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Сколько строк вставлять за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        importer = Importer(options['chunk_size'])
+        for name in SCHEMA:
+            path = os.path.join(
+                options['directory'], f'{name}.{options["format"]}'
+            )
+            if not os.path.exists(path):
+                continue
+            started = time.monotonic()
+            count = 0
+            with open(path, newline='', encoding='utf-8') as stream:
+                rows = read_rows(stream, options['format'])
+                for loaded in importer.load(name, rows):
+                    count += loaded
+                    elapsed = max(time.monotonic() - started, 1e-6)
+                    self.stdout.write(
+                        f'{name}: {count} строк, '
+                        f'{count / elapsed:.0f} строк/с'
+                    )
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.models import ModerationJob
+from posts.moderation import run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет массовые действия модераторов из очереди пачками по '
+        'MODERATION_BATCH_SIZE объектов на транзакцию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Сколько объектов обрабатывать за одну транзакцию.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Проверять очередь каждые N секунд, не завершаясь.',
+        )
+        parser.add_argument(
+            '--requeue',
+            action='store_true',
+            help='Вернуть в очередь задачи, прерванные на середине.',
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue']:
+            requeued = ModerationJob.objects.filter(
+                status=ModerationJob.RUNNING
+            ).update(status=ModerationJob.PENDING)
+            self.stdout.write(f'Возвращено в очередь: {requeued}')
+        while True:
+            done = run_pending(options['batch_size'])
+            if done:
+                self.stdout.write(f'Выполнено задач: {done}')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_group_is_deleted'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='body_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='preview',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='body_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='preview',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью (HTML)'),
+        ),
+    ]
@@ -1,9 +1,45 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
 
 User = get_user_model()
 
 
+def render_text(text):
+    """Превью и полный текст поста в виде готового экранированного HTML."""
+    preview = Truncator(text).chars(settings.POST_PREVIEW_LENGTH)
+    return linebreaksbr(preview, True), linebreaksbr(text, True)
+
+
+class VisibleManager(models.Manager):
+    """Менеджер лент (``visible``): без скрытых модератором записей.
+
+    Записи удалённых авторов (``is_active=False``) и групп
+    (``is_deleted``), ожидающих фоновой очистки, тоже скрыты. У архивных
+    постов ``is_hidden`` нет: скрытые посты в архив не попадают.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = {field.name: field for field in self.model._meta.fields}
+        if 'is_hidden' in fields:
+            queryset = queryset.filter(is_hidden=False)
+        if fields['author'].null:
+            queryset = queryset.filter(
+                Q(author__isnull=True) | Q(author__is_active=True)
+            )
+        else:
+            queryset = queryset.filter(author__is_active=True)
+        if 'group' in fields:
+            queryset = queryset.filter(
+                Q(group__isnull=True) | Q(group__is_deleted=False)
+            )
+        return queryset
+
+
 class Group(models.Model):
     title = models.CharField(
         max_length=200,
@@ -16,20 +52,61 @@ class Group(models.Model):
     description = models.TextField(
         verbose_name='Записи группы',
     )
+    is_deleted = models.BooleanField(
+        default=False,
+        verbose_name='Удалена',
+    )
 
     def __str__(self) -> str:
         return self.title
 
 
-class Post(models.Model):
+class RenderedText(models.Model):
+    """Производные от text колонки, которые пересчитываются при save().
+
+    Ленты читают только короткое превью, а страница поста — готовый
+    HTML, так что шаблоны не обрабатывают текст на каждый запрос.
+    Для bulk_create поля заполняются через render_text, для старых
+    строк — командой backfill_post_html.
+    """
+    preview = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Превью (HTML)',
+    )
+    body_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Текст (HTML)',
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.preview, self.body_html = render_text(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {
+                *update_fields, 'preview', 'body_html'
+            }
+        super().save(*args, **kwargs)
+
+
+class Post(RenderedText):
     text = models.TextField(
         verbose_name='Текст',
         help_text='Текст поста',
     )
     pub_date = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         verbose_name='Дата публикации',
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -50,6 +127,13 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name='Скрыт модератором',
+    )
+
+    objects = models.Manager()
+    visible = VisibleManager()
 
     def __str__(self) -> str:
         return self.text
@@ -77,8 +161,16 @@ class Comment(models.Model):
     )
     created = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         verbose_name='Дата комментария',
     )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name='Скрыт модератором',
+    )
+
+    objects = models.Manager()
+    visible = VisibleManager()
 
     def __str__(self) -> str:
         return self.text
@@ -108,3 +200,115 @@ class Follow(models.Model):
 
     def __str__(self) -> str:
         return f'{self.user} успешно подписан на {self.author}'
+
+
+class ArchivedPost(RenderedText):
+    """Пост, перенесённый из горячей таблицы командой archive_posts."""
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст')
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор',
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Группа',
+    )
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+    archived = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата архивации',
+    )
+
+    objects = models.Manager()
+    visible = VisibleManager()
+
+    def __str__(self) -> str:
+        return self.text
+
+    class Meta:
+        ordering = ['-pub_date']
+        indexes = [models.Index(fields=['author', '-pub_date'])]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        related_name='comments',
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        User,
+        related_name='archived_comments',
+        on_delete=models.CASCADE,
+        null=True,
+    )
+    text = models.TextField(verbose_name='Текст')
+    created = models.DateTimeField(verbose_name='Дата комментария')
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name='Скрыт модератором',
+    )
+
+    objects = models.Manager()
+    visible = VisibleManager()
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class ModerationJob(models.Model):
+    """Массовое действие из админки, выполняемое в фоне пачками."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    model = models.CharField(max_length=100, verbose_name='Модель')
+    action = models.CharField(max_length=20, verbose_name='Действие')
+    object_ids = models.TextField(verbose_name='Объекты')
+    params = models.TextField(default='{}', verbose_name='Параметры')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        db_index=True,
+        verbose_name='Статус',
+    )
+    total = models.PositiveIntegerField(default=0, verbose_name='Всего')
+    processed = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Обработано',
+    )
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='moderation_jobs',
+        verbose_name='Модератор',
+    )
+    created = models.DateTimeField(auto_now_add=True, verbose_name='Создана')
+    updated = models.DateTimeField(auto_now=True, verbose_name='Обновлена')
+
+    class Meta:
+        ordering = ['-pk']
+        verbose_name = 'Задача модерации'
+        verbose_name_plural = 'Задачи модерации'
+
+    def __str__(self) -> str:
+        return f'{self.action} {self.model}: {self.processed}/{self.total}'
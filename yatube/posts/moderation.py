@@ -0,0 +1,176 @@
+"""Фоновые массовые действия модератора.
+
+Админка только создаёт ModerationJob со списком id; выполняет её
+``run_pending`` — в отдельном потоке сразу после коммита или командой
+``manage.py run_moderation_jobs``. Каждая пачка из MODERATION_BATCH_SIZE
+объектов обрабатывается в своей короткой транзакции, а счётчик
+``processed`` показывает прогресс в админке.
+"""
+import json
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+
+from core.cache.tags import bump
+
+from . import purge
+from .models import Comment, Group, ModerationJob, Post
+
+DELETE = 'delete'
+HIDE = 'hide'
+MOVE = 'move'
+PURGE = purge.PURGE
+ACTIONS = {
+    'posts.post': (DELETE, HIDE, MOVE),
+    'posts.comment': (DELETE, HIDE),
+    'posts.group': (PURGE, HIDE, MOVE),
+    'auth.user': (PURGE,),
+}
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def enqueue(queryset, action, user=None, **params):
+    """Ставит действие над queryset в очередь и возвращает задачу."""
+    label = queryset.model._meta.label_lower
+    if action not in ACTIONS.get(label, ()):
+        raise ValueError(f'Действие {action} недоступно для {label}')
+    ids = list(queryset.values_list('pk', flat=True))
+    job = ModerationJob.objects.create(
+        model=label,
+        action=action,
+        object_ids=json.dumps(ids),
+        params=json.dumps(params),
+        total=len(ids),
+        created_by=user,
+    )
+    if action == PURGE:
+        purge.mark_deleted(queryset.model._base_manager.filter(pk__in=ids))
+    if settings.MODERATION_RUN_IN_THREAD:
+        transaction.on_commit(start_worker)
+    return job
+
+
+def start_worker():
+    threading.Thread(target=run_in_thread, daemon=True).start()
+
+
+def run_in_thread():
+    try:
+        run_pending()
+    finally:
+        connection.close()
+
+
+def claim(job):
+    return ModerationJob.objects.filter(
+        pk=job.pk, status=ModerationJob.PENDING
+    ).update(status=ModerationJob.RUNNING) == 1
+
+
+def run_pending(batch_size=None):
+    """Выполняет все задачи из очереди; вернёт число выполненных."""
+    done = 0
+    for job in ModerationJob.objects.filter(
+        status=ModerationJob.PENDING
+    ).order_by('pk'):
+        if claim(job):
+            run_job(job, batch_size)
+            done += 1
+    return done
+
+
+def run_job(job, batch_size=None):
+    batch_size = batch_size or settings.MODERATION_BATCH_SIZE
+    model = apps.get_model(job.model)
+    params = json.loads(job.params)
+    ids = json.loads(job.object_ids)[job.processed:]
+    try:
+        for chunk in chunked(ids, batch_size):
+            if job.action == PURGE:
+                purge.purge(model, chunk, batch_size)
+            else:
+                HANDLERS[model](job.action, chunk, params, batch_size)
+            job.processed += len(chunk)
+            job.save(update_fields=['processed', 'updated'])
+    except Exception as error:
+        job.status = ModerationJob.FAILED
+        job.error = repr(error)
+        job.save(update_fields=['status', 'error', 'updated'])
+        raise
+    job.status = ModerationJob.DONE
+    job.save(update_fields=['status', 'updated'])
+
+
+def bump_posts(rows, *extra_tags):
+    """Сбрасывает кэш лент для постов, изменённых через update()."""
+    tags = {'feed:global', *extra_tags}
+    authors = set()
+    for post_id, author_id, group_id in rows:
+        tags.add(f'post:{post_id}')
+        authors.add(author_id)
+        if group_id:
+            tags.add(f'group:{group_id}')
+    tags.update(f'author:{author_id}' for author_id in authors)
+    bump(*tags)
+
+
+@transaction.atomic
+def moderate_posts(action, ids, params, batch_size):
+    posts = Post.objects.filter(pk__in=ids)
+    if action == DELETE:
+        # Комментарии удаляются каскадом, сигналы сами сбросят кэш.
+        posts.delete()
+        return
+    rows = list(posts.values_list('pk', 'author_id', 'group_id'))
+    if action == HIDE:
+        posts.update(is_hidden=True)
+        bump_posts(rows)
+    elif action == MOVE:
+        group_id = params.get('group_id')
+        posts.update(group_id=group_id)
+        bump_posts(rows, f'group:{group_id}' if group_id else 'feed:global')
+
+
+@transaction.atomic
+def moderate_comments(action, ids, params, batch_size):
+    comments = Comment.objects.filter(pk__in=ids)
+    post_ids = set(comments.values_list('post_id', flat=True))
+    if action == DELETE:
+        comments.delete()
+    elif action == HIDE:
+        comments.update(is_hidden=True)
+    bump(*(f'post:{post_id}' for post_id in post_ids))
+
+
+def moderate_groups(action, ids, params, batch_size):
+    """Действие над всеми постами групп, по batch_size за транзакцию."""
+    target = params.get('group_id')
+    for group_id in ids:
+        if action == MOVE and group_id == target:
+            continue
+        posts = Post.objects.filter(group_id=group_id)
+        if action == HIDE:
+            posts = posts.filter(is_hidden=False)
+        while True:
+            with transaction.atomic():
+                post_ids = list(
+                    posts.order_by('pk').values_list('pk', flat=True)[
+                        :batch_size
+                    ]
+                )
+                if not post_ids:
+                    break
+                moderate_posts(action, post_ids, params, batch_size)
+
+
+HANDLERS = {
+    Post: moderate_posts,
+    Comment: moderate_comments,
+    Group: moderate_groups,
+}
@@ -0,0 +1,89 @@
+"""Потоковая выгрузка постов и комментариев автора."""
+import json
+import zipfile
+
+from django.core.files.storage import default_storage
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+CHUNK_SIZE = 500
+FILE_CHUNK_SIZE = 64 * 1024
+POST_FIELDS = ('id', 'text', 'pub_date', 'group__slug', 'image')
+COMMENT_FIELDS = ('id', 'post_id', 'text', 'created')
+
+
+def author_records(author):
+    """Строки выгрузки автора: посты и комментарии, горячие и архивные.
+
+    Скрытые модератором записи автор тоже получает.
+    """
+    querysets = (
+        ('post', Post.objects.filter(author=author).values(*POST_FIELDS)),
+        ('post', ArchivedPost.objects.filter(
+            author=author).values(*POST_FIELDS)),
+        ('comment', Comment.objects.filter(
+            author=author).values(*COMMENT_FIELDS)),
+        ('comment', ArchivedComment.objects.filter(
+            author=author).values(*COMMENT_FIELDS)),
+    )
+    for kind, queryset in querysets:
+        for row in queryset.order_by('pk').iterator(chunk_size=CHUNK_SIZE):
+            yield kind, row
+
+
+def ndjson_lines(author):
+    for kind, row in author_records(author):
+        row['type'] = kind
+        yield json.dumps(row, ensure_ascii=False, default=str) + '\n'
+
+
+class _StreamBuffer:
+    """Файлоподобный буфер без seek: zipfile пишет в него, мы забираем."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def author_images(author):
+    for model in (Post, ArchivedPost):
+        yield from model.objects.filter(author=author).exclude(
+            image=''
+        ).values_list('image', flat=True).iterator(chunk_size=CHUNK_SIZE)
+
+
+def zip_chunks(author):
+    """Отдаёт zip-архив кусками: data.ndjson и файлы картинок."""
+    return filter(None, _zip_parts(author))
+
+
+def _zip_parts(author):
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('data.ndjson', 'w', force_zip64=True) as entry:
+            for line in ndjson_lines(author):
+                entry.write(line.encode())
+                yield buffer.pop()
+        for name in author_images(author):
+            if not default_storage.exists(name):
+                continue
+            info = zipfile.ZipInfo(f'media/{name}')
+            info.compress_type = zipfile.ZIP_STORED
+            with default_storage.open(name) as source, archive.open(
+                info, 'w', force_zip64=True
+            ) as entry:
+                for chunk in iter(lambda: source.read(FILE_CHUNK_SIZE), b''):
+                    entry.write(chunk)
+                    yield buffer.pop()
+    yield buffer.pop()
@@ -0,0 +1,164 @@
+"""Мягкое удаление пользователей и групп с фоновой очисткой.
+
+Удаление сразу помечает объект (``is_active=False`` у пользователя,
+``is_deleted`` у группы) и ставит ModerationJob с действием ``purge``.
+Пока задача не выполнена, менеджеры ``visible`` прячут записи объекта
+по этим флагам. Сама очистка удаляет сессии пользователя, подписки,
+затем комментарии (и чужие — к удаляемым постам), затем посты пачками
+по MODERATION_BATCH_SIZE, каждая в своей транзакции; картинки постов
+и их миниатюры — после коммита пачки.
+"""
+from string import Formatter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from sorl.thumbnail import delete as delete_thumbnails
+
+from core.auth import user_cache_key
+from core.cache.tags import bump
+from core.sessions import delete_user_sessions
+
+from .models import (
+    ArchivedComment,
+    ArchivedPost,
+    Comment,
+    Follow,
+    Group,
+    Post,
+    User,
+)
+from .signals import muted
+
+PURGE = 'purge'
+
+
+def get_author_or_404(username):
+    return get_object_or_404(User, username=username, is_active=True)
+
+
+def mark_deleted(queryset):
+    """Помечает объекты удалёнными и сразу прячет их записи из лент.
+
+    update() не шлёт post_save, поэтому пользователей сбрасываем из кэша
+    CachedModelBackend здесь же: неактивный пользователь сразу выходит
+    из аккаунта, а его сессии удалит уже фоновая очистка.
+    """
+    model = queryset.model
+    ids = list(queryset.values_list('pk', flat=True))
+    tags = ['feed:global']
+    if model is User:
+        queryset.update(is_active=False)
+        caches[settings.AUTH_USER_CACHE_ALIAS].delete_many(
+            [user_cache_key(user_id) for user_id in ids]
+        )
+        for user_id in ids:
+            tags += [f'author:{user_id}', f'author_info:{user_id}']
+        group_ids = Post.objects.filter(
+            author_id__in=ids, group__isnull=False
+        ).values_list('group_id', flat=True).distinct()
+        tags += [f'group:{group_id}' for group_id in group_ids]
+    else:
+        queryset.update(is_deleted=True)
+        tags += [f'group:{group_id}' for group_id in ids]
+        tags += [f'group_info:{group_id}' for group_id in ids]
+        tags.append('group:all')
+    bump(*tags)
+    return ids
+
+
+def delete_images(names):
+    for name in names:
+        delete_thumbnails(name)
+
+
+# Теги, которые сбрасывает удаление строки; в скобках — поля строки.
+POST_TAGS = ('post:{id}', 'author:{author_id}', 'group:{group_id}')
+COMMENT_TAGS = ('post:{post_id}',)
+FOLLOW_TAGS = ('follow:{user_id}', 'author:{author_id}')
+
+
+def batch_tags(rows, templates):
+    tags = set()
+    for row in rows:
+        for template in templates:
+            tag = template.format(**row)
+            if not tag.endswith(':None'):
+                tags.add(tag)
+    return tags
+
+
+def delete_in_batches(queryset, batch_size, image_field=None, tags=()):
+    """Удаляет queryset пачками; вернёт число удалённых корневых строк.
+
+    Зависимые строки вызывающий удаляет раньше, своими пачками, так что
+    каскад не раздувает транзакцию. Сигналы строк приглушены: теги
+    ``tags`` сбрасываются одним bump на пачку.
+    """
+    fields = {'id', *(
+        name for template in tags
+        for _, name, _, _ in Formatter().parse(template) if name
+    )}
+    if image_field:
+        fields.add(image_field)
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.order_by('pk').values(*fields)[:batch_size]
+            )
+            if not rows:
+                return deleted
+            with muted():
+                queryset.model._base_manager.filter(
+                    pk__in=[row['id'] for row in rows]
+                ).delete()
+            bump(*batch_tags(rows, tags))
+            names = [row[image_field] for row in rows
+                     if image_field and row[image_field]]
+            if names:
+                transaction.on_commit(lambda names=names: delete_images(names))
+        deleted += len(rows)
+
+
+def purge_user(user_id, batch_size):
+    delete_user_sessions([user_id])
+    for queryset in (
+        Follow.objects.filter(user_id=user_id),
+        Follow.objects.filter(author_id=user_id),
+    ):
+        delete_in_batches(queryset, batch_size, tags=FOLLOW_TAGS)
+    for queryset in (
+        Comment.objects.filter(author_id=user_id),
+        Comment.objects.filter(post__author_id=user_id),
+        ArchivedComment.objects.filter(author_id=user_id),
+        ArchivedComment.objects.filter(post__author_id=user_id),
+    ):
+        delete_in_batches(queryset, batch_size, tags=COMMENT_TAGS)
+    for queryset in (
+        Post.objects.filter(author_id=user_id),
+        ArchivedPost.objects.filter(author_id=user_id),
+    ):
+        delete_in_batches(queryset, batch_size, 'image', POST_TAGS)
+    User.objects.filter(pk=user_id).delete()
+
+
+def purge_group(group_id, batch_size):
+    for queryset in (
+        Comment.objects.filter(post__group_id=group_id),
+        ArchivedComment.objects.filter(post__group_id=group_id),
+    ):
+        delete_in_batches(queryset, batch_size, tags=COMMENT_TAGS)
+    for queryset in (
+        Post.objects.filter(group_id=group_id),
+        ArchivedPost.objects.filter(group_id=group_id),
+    ):
+        delete_in_batches(queryset, batch_size, 'image', POST_TAGS)
+    Group.objects.filter(pk=group_id).delete()
+
+
+def purge(model, ids, batch_size):
+    handler = purge_user if model is User else purge_group
+    for object_id in ids:
+        handler(object_id, batch_size)
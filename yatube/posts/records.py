@@ -0,0 +1,141 @@
+"""Лёгкие записи постов для лент и API.
+
+Лентам нужно около десятка полей поста, автора и группы, а Post с
+select_related создаёт на каждую строку три модели со всем их
+состоянием. Здесь строки читаются одним values_list и складываются в
+объекты со ``__slots__``; автор и группа, повторяющиеся на странице,
+создаются один раз. Записи отвечают на то же, что карточка берёт у
+модели: ``post.author.get_full_name``, ``post.group.slug``,
+``post.image`` (имя файла — его понимают и sorl, и storage.url).
+
+Полный текст лентам не нужен: карточка показывает готовое превью, так
+что ``text`` читается, только если попросить (``text=True``, как в API).
+"""
+from .models import Post
+
+COLUMNS = (
+    'id', 'preview', 'pub_date', 'image',
+    'author_id', 'author__username', 'author__first_name',
+    'author__last_name',
+    'group_id', 'group__slug', 'group__title',
+)
+
+
+class AuthorRecord:
+    __slots__ = ('id', 'username', 'first_name', 'last_name')
+
+    def __init__(self, id, username, first_name, last_name):
+        self.id = id
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+
+    @property
+    def pk(self):
+        return self.id
+
+    def get_full_name(self):
+        return f'{self.first_name} {self.last_name}'.strip()
+
+    def __str__(self):
+        return self.username
+
+
+class GroupRecord:
+    __slots__ = ('id', 'slug', 'title')
+
+    def __init__(self, id, slug, title):
+        self.id = id
+        self.slug = slug
+        self.title = title
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __str__(self):
+        return self.title
+
+
+class PostRecord:
+    __slots__ = (
+        'id', 'model_name', 'preview', 'pub_date', 'updated', 'image',
+        'author', 'group', 'text',
+    )
+
+    def __init__(self, id, model_name, preview, pub_date, updated, image,
+                 author, group, text=None):
+        self.id = id
+        self.model_name = model_name
+        self.preview = preview
+        self.text = text
+        self.pub_date = pub_date
+        self.updated = updated
+        self.image = image
+        self.author = author
+        self.group = group
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def author_id(self):
+        return self.author.id
+
+    @property
+    def group_id(self):
+        return self.group.id if self.group is not None else None
+
+    def __repr__(self):
+        return f'<PostRecord {self.model_name}:{self.id}>'
+
+
+def post_records(queryset, text=False):
+    """Строки queryset постов (Post или ArchivedPost) как PostRecord."""
+    model = queryset.model
+    has_updated = model is Post
+    columns = COLUMNS + (('updated',) if has_updated else ())
+    if text:
+        columns += ('text',)
+    model_name = model._meta.model_name
+    authors = {}
+    groups = {}
+    records = []
+    for row in queryset.values_list(*columns):
+        author = authors.get(row[4])
+        if author is None:
+            author = authors[row[4]] = AuthorRecord(*row[4:8])
+        group = None
+        if row[8] is not None:
+            group = groups.get(row[8])
+            if group is None:
+                group = groups[row[8]] = GroupRecord(*row[8:11])
+        records.append(PostRecord(
+            row[0], model_name, row[1], row[2],
+            row[11] if has_updated else None, row[3], author, group,
+            row[-1] if text else None,
+        ))
+    return records
+
+
+class FeedRecords:
+    """Queryset постов, срезы которого отдают PostRecord.
+
+    count(), query и прочее идут к самому queryset, поэтому объект
+    подходит для ApproximatePaginator и ArchiveFallthrough.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def __getattr__(self, name):
+        return getattr(self.queryset, name)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        return post_records(self.queryset[key])
@@ -0,0 +1,88 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache.tags import bump
+
+from .models import Comment, Follow, Group, Post, User
+
+_state = threading.local()
+
+
+@contextmanager
+def muted():
+    """Без сброса кэша по строкам: вызывающий сбросит теги пачкой сам."""
+    _state.muted = True
+    try:
+        yield
+    finally:
+        _state.muted = False
+
+
+def is_muted():
+    return getattr(_state, 'muted', False)
+
+
+@receiver(pre_save, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    """Запоминает группу до сохранения: её лента тоже теряет пост."""
+    instance._previous_group_id = None
+    if instance.pk is not None:
+        instance._previous_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    if is_muted():
+        return
+    tags = [
+        f'post:{instance.pk}',
+        f'author:{instance.author_id}',
+        'feed:global',
+    ]
+    for group_id in {
+        instance.group_id, getattr(instance, '_previous_group_id', None)
+    }:
+        if group_id:
+            tags.append(f'group:{group_id}')
+    bump(*tags)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    if is_muted():
+        return
+    bump(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    bump(
+        f'group:{instance.pk}',
+        f'group_info:{instance.pk}',
+        'group:all',
+        'feed:global',
+    )
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow(sender, instance, **kwargs):
+    if is_muted():
+        return
+    bump(f'follow:{instance.user_id}', f'author:{instance.author_id}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump(f'author:{instance.pk}', f'author_info:{instance.pk}', 'feed:global')
@@ -0,0 +1,67 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core.cache.tags import tag_version_map
+from core.page_cache import add_cache_tags
+from posts.forms import CommentForm
+from posts.models import Follow
+
+register = template.Library()
+
+
+@register.simple_tag
+def comment_form():
+    return CommentForm()
+
+
+@register.simple_tag
+def is_following(user, username):
+    if not user.is_authenticated:
+        return False
+    return Follow.objects.filter(
+        user=user, author__username=username
+    ).exists()
+
+
+def post_card_key(post, versions):
+    changed = post.updated or post.pub_date
+    group_version = versions.get(f'group_info:{post.group_id}', '')
+    return (
+        f'post_card:{post.model_name}:{post.pk}:'
+        f'{changed.timestamp()}:{versions[f"author_info:{post.author_id}"]}:'
+        f'{group_version}'
+    )
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Отрендеренные карточки постов, каждая закэширована отдельно.
+
+    Ключ карточки меняется вместе с постом, его автором и группой. Все
+    карточки страницы и версии их тегов читаются двумя get_many, так что
+    новый пост рендерит только свою карточку. Теги карточек добавляются
+    к кэшу страницы, чтобы правка автора или группы сбрасывала и её.
+    """
+    posts = list(posts)
+    tags = {f'author_info:{post.author_id}' for post in posts}
+    tags.update(
+        f'group_info:{post.group_id}' for post in posts if post.group_id
+    )
+    request = context.get('request')
+    if tags and request is not None:
+        add_cache_tags(request, *sorted(tags))
+    versions = tag_version_map(*tags)
+    keys = [post_card_key(post, versions) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            missing[key] = render_to_string(
+                'posts/includes/post_card.html', {'post': post}
+            )
+    if missing:
+        cache.set_many(missing)
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
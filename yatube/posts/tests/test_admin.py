@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.admin import CURSOR_VAR
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ScalableAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.user = User.objects.create_user(username='auth')
+        for i in range(5):
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'group_{i}', description='-'
+            )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}') for i in range(120)
+        )
+        post = Post.objects.first()
+        Comment.objects.create(post=post, author=cls.user, text='Ком')
+        Follow.objects.create(user=cls.admin, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_cursor_pages_cover_all_posts(self):
+        url = reverse('admin:posts_post_changelist')
+        seen, params = [], {}
+        while True:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            cl = response.context['cl']
+            seen.extend(cl.result_list.values_list('pk', flat=True))
+            if not cl.next_cursor:
+                break
+            params = {CURSOR_VAR: cl.next_cursor}
+        self.assertEqual(
+            seen, list(Post.objects.order_by('-pk').values_list(
+                'pk', flat=True
+            ))
+        )
+
+    def test_group_choices_not_queried_per_row(self):
+        """Список групп для list_editable не запрашивается на каждую строку."""
+        url = reverse('admin:posts_post_changelist')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        group_queries = [
+            query for query in context.captured_queries
+            if 'FROM "posts_group"' in query['sql']
+        ]
+        self.assertEqual(group_queries, [])
+
+    def test_other_changelists(self):
+        for model in ('comment', 'follow', 'group'):
+            with self.subTest(model=model):
+                response = self.client.get(
+                    reverse(f'admin:posts_{model}_changelist')
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_sorted_changelist_uses_pages(self):
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'o': '3'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['cl'].cursor_mode)
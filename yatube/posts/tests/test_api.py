@@ -0,0 +1,176 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class PostApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f'Пост {i}')
+            for i in range(15)
+        )
+        # Одинаковое время у всех постов: курсор различает их по id.
+        Post.objects.update(pub_date=timezone.now() - timedelta(days=1))
+        cls.post = Post.objects.order_by('id').first()
+        Comment.objects.create(post=cls.post, author=cls.reader, text='Ком')
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_cursor_walks_whole_feed(self):
+        """Курсор проходит всю ленту без повторов и пропусков."""
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', kwargs={'slug': 'test_slug'}),
+            reverse('posts:api_profile', kwargs={'username': 'auth'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                ids, cursor = [], None
+                while True:
+                    params = {'limit': 4}
+                    if cursor:
+                        params['cursor'] = cursor
+                    data = self.client.get(url, params).json()
+                    ids.extend(row['id'] for row in data['results'])
+                    cursor = data['next']
+                    if not cursor:
+                        break
+                self.assertEqual(
+                    ids,
+                    list(Post.objects.order_by('-pub_date', '-id')
+                         .values_list('id', flat=True)),
+                )
+
+    def test_sparse_fields(self):
+        data = self.client.get(
+            reverse('posts:api_index'), {'fields': 'id,author'}
+        ).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'author'})
+        self.assertEqual(data['results'][0]['author'], 'auth')
+
+    def test_bad_parameters(self):
+        for params in ({'fields': 'password'}, {'cursor': '!!!'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('posts:api_index'), params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_follow_feed(self):
+        url = reverse('posts:api_follow_index')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        data = self.reader_client.get(url).json()
+        self.assertEqual(len(data['results']), 10)
+
+    def test_post_detail(self):
+        url = reverse(
+            'posts:api_post_detail', kwargs={'post_id': self.post.pk}
+        )
+        data = self.client.get(url).json()
+        self.assertEqual(data['text'], self.post.text)
+        self.assertEqual(data['group'], 'test_slug')
+        self.assertEqual(data['comments'][0]['author'], 'reader')
+        missing = reverse('posts:api_post_detail', kwargs={'post_id': 0})
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_etag_until_change(self):
+        """304 по ETag, пока лента не изменилась."""
+        url = reverse('posts:api_index')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['text'], 'Новый пост')
+
+
+@override_settings(SSE_MAX_SECONDS=0, SSE_POLL_INTERVAL=0)
+class NewPostsApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.first = Post.objects.create(author=cls.user, text='Первый')
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_new_posts_by_scope(self):
+        post = Post.objects.create(
+            author=self.user, group=self.group, text='Новый'
+        )
+        cases = (
+            {'scope': 'global'},
+            {'scope': 'group', 'slug': 'test_slug'},
+            {'scope': 'follow'},
+        )
+        for params in cases:
+            with self.subTest(params=params):
+                data = self.client.get(
+                    reverse('posts:api_new_posts'),
+                    {'since': self.first.pk, **params},
+                ).json()
+                self.assertEqual(data['count'], 1)
+                self.assertEqual(data['ids'], [post.pk])
+
+    @override_settings(CACHE_OUTBOX_POLL_INTERVAL=60)
+    def test_no_queries_when_nothing_new(self):
+        """Пока high-water не сдвинулся, посты не запрашиваются."""
+        url = reverse('posts:api_new_posts')
+        self.client.get(url, {'since': self.first.pk})
+        with self.assertNumQueries(0):
+            data = self.client.get(url, {'since': self.first.pk}).json()
+        self.assertEqual(data['count'], 0)
+
+    def test_bad_scope(self):
+        cases = (
+            ({'scope': 'everything'}, 400),
+            ({'since': 'abc'}, 400),
+        )
+        for params, status in cases:
+            with self.subTest(params=params):
+                response = self.client.get(
+                    reverse('posts:api_new_posts'), params
+                )
+                self.assertEqual(response.status_code, status)
+        response = Client().get(
+            reverse('posts:api_new_posts'), {'scope': 'follow'}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_event_stream(self):
+        post = Post.objects.create(author=self.user, text='Новый')
+        response = self.client.get(
+            reverse('posts:api_new_posts_stream'),
+            HTTP_LAST_EVENT_ID=str(self.first.pk),
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn(f'id: {post.pk}\nevent: posts\n', body)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive_batch
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post, User
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Старый пост',
+        )
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        Comment.objects.create(
+            post=cls.old_post,
+            author=cls.author,
+            text='Старый комментарий',
+        )
+        Comment.objects.create(
+            post=cls.old_post,
+            author=cls.author,
+            text='Скрытый комментарий',
+            is_hidden=True,
+        )
+        cls.new_post = Post.objects.create(
+            author=cls.author,
+            text='Новый пост',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        archive_batch(timezone.now() - timedelta(days=365), 100)
+
+    def test_old_posts_moved_to_archive(self):
+        self.assertFalse(Post.objects.filter(pk=self.old_post.pk).exists())
+        self.assertTrue(Post.objects.filter(pk=self.new_post.pk).exists())
+        self.assertTrue(
+            ArchivedPost.objects.filter(pk=self.old_post.pk).exists()
+        )
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_hidden_comments_archived_hidden(self):
+        """Скрытый комментарий не теряется при переносе поста в архив."""
+        self.assertEqual(
+            dict(ArchivedComment.objects.values_list('text', 'is_hidden')),
+            {'Старый комментарий': False, 'Скрытый комментарий': True},
+        )
+
+    def test_post_detail_falls_through_to_archive(self):
+        response = self.guest_client.get(reverse(
+            'posts:post_detail', kwargs={'post_id': self.old_post.pk}))
+        self.assertEqual(response.context['post'].text, 'Старый пост')
+        self.assertTrue(response.context['is_archived'])
+        self.assertEqual(len(response.context['comments']), 1)
+
+    def test_profile_lists_archived_posts_after_hot(self):
+        response = self.guest_client.get(reverse(
+            'posts:profile', kwargs={'username': 'author'}))
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 2)
+        self.assertEqual(
+            [post.preview for post in page_obj],
+            ['Новый пост', 'Старый пост'],
+        )
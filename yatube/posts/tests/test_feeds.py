@@ -0,0 +1,83 @@
+from xml.etree import ElementTree
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+class FeedsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Пост в группе'
+        )
+        Post.objects.create(author=cls.user, text='Пост без группы')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def get_xml(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertTrue(response.streaming)
+        return response, ElementTree.fromstring(
+            b''.join(response.streaming_content)
+        )
+
+    def test_rss_items(self):
+        cases = (
+            (reverse('posts:feed', args=['rss']), 2),
+            (reverse('posts:group_feed', args=['rss', 'test_slug']), 1),
+            (reverse('posts:profile_feed', args=['rss', 'auth']), 2),
+        )
+        for url, count in cases:
+            with self.subTest(url=url):
+                _, root = self.get_xml(url)
+                self.assertEqual(len(root.findall('channel/item')), count)
+
+    def test_atom(self):
+        _, root = self.get_xml(reverse('posts:feed', args=['atom']))
+        titles = [entry.find(ATOM + 'title').text
+                  for entry in root.findall(ATOM + 'entry')]
+        self.assertIn('Пост в группе', titles)
+
+    def test_unknown_format(self):
+        response = self.client.get(reverse('posts:feed', args=['json']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get_and_invalidation(self):
+        url = reverse('posts:feed', args=['rss'])
+        response, _ = self.get_xml(url)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        response, root = self.get_xml(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'Исправленный пост',
+            [item.find('title').text for item in root.iter('item')],
+        )
+
+    def test_if_modified_since_sees_hidden_post(self):
+        """Без Last-Modified скрытие поста не даёт ложного 304."""
+        url = reverse('posts:feed', args=['rss'])
+        response, _ = self.get_xml(url)
+        self.assertNotIn('Last-Modified', response)
+        Post.objects.filter(pk=self.post.pk).update(is_hidden=True)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,107 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import moderation
+from posts.models import Comment, Group, ModerationJob, Post, User
+
+
+@override_settings(MODERATION_BATCH_SIZE=3)
+class ModerationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Старая группа', slug='old', description='-'
+        )
+        cls.target = Group.objects.create(
+            title='Новая группа', slug='new', description='-'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.posts = [
+            Post.objects.create(
+                author=self.user, group=self.group, text=f'Пост {i}'
+            )
+            for i in range(7)
+        ]
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def run_action(self, model, action, ids, **extra):
+        response = self.client.post(
+            reverse(f'admin:posts_{model}_changelist'),
+            {'action': action, '_selected_action': ids, **extra},
+        )
+        self.assertEqual(response.status_code, 302)
+        job = ModerationJob.objects.get()
+        self.assertEqual(job.status, ModerationJob.PENDING)
+        call_command('run_moderation_jobs', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ModerationJob.DONE)
+        self.assertEqual(job.processed, job.total)
+        return job
+
+    def test_hide_posts_removes_them_from_feeds(self):
+        ids = [post.pk for post in self.posts[:4]]
+        self.client.get(reverse('posts:index'))
+        self.run_action('post', 'hide_in_background', ids)
+        self.assertEqual(Post.visible.count(), 3)
+        self.assertEqual(Post.objects.count(), 7)
+        response = Client().get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 3)
+
+    def test_move_posts(self):
+        ids = [post.pk for post in self.posts]
+        self.run_action(
+            'post', 'move_in_background', ids, group=self.target.pk
+        )
+        self.assertEqual(self.target.groups.count(), 7)
+
+    def test_delete_group(self):
+        Comment.objects.create(
+            post=self.posts[0], author=self.user, text='Ком'
+        )
+        self.run_action('group', 'purge_in_background', [self.group.pk])
+        self.assertFalse(Group.objects.filter(pk=self.group.pk).exists())
+        self.assertEqual(Post.objects.count(), 0)
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_hide_comment(self):
+        comment = Comment.objects.create(
+            post=self.posts[0], author=self.user, text='Спам'
+        )
+        self.run_action('comment', 'hide_in_background', [comment.pk])
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.posts[0].pk])
+        )
+        self.assertNotContains(response, 'Спам')
+
+    def test_hidden_rows_stay_in_default_manager(self):
+        """Скрытые записи видны валидации внешних ключей и dumpdata."""
+        post = self.posts[0]
+        Post.objects.filter(pk=post.pk).update(is_hidden=True)
+        Comment(post=post, author=self.user, text='Ответ').full_clean()
+        out = StringIO()
+        call_command('dumpdata', 'posts.post', stdout=out)
+        self.assertIn(f'"pk": {post.pk},', out.getvalue())
+
+    def test_progress_and_batches(self):
+        job = moderation.enqueue(
+            Post.objects.all(), moderation.HIDE, self.admin
+        )
+        moderation.claim(job)
+        moderation.run_job(job)
+        self.assertEqual((job.processed, job.total), (7, 7))
+        response = self.client.get(
+            reverse('admin:posts_moderationjob_changelist')
+        )
+        self.assertContains(response, '7/7 (100%)')
@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache.tags import bump
+
+from posts.models import Follow, Group, Post, User
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый текст',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    @override_settings(CACHE_OUTBOX_POLL_INTERVAL=60)
+    def test_anonymous_hit_without_queries(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        response = self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            cached = self.guest_client.get(url)
+        self.assertEqual(response.content, cached.content)
+
+    def test_holes_personalized_for_logged_in_user(self):
+        """Персональные фрагменты не утекают из страницы гостя."""
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        self.guest_client.get(url)
+        response = self.authorized_client.get(url)
+        content = response.content.decode()
+        self.assertIn('Пользователь: reader', content)
+        self.assertIn('Подписаться', content)
+        self.assertNotIn('<!--hole:', content)
+        self.assertNotIn('Войти', content)
+
+    def test_page_invalidated_by_tags(self):
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Новый пост')
+
+    def test_moved_post_leaves_old_group_page(self):
+        old = Group.objects.create(title='Старая', slug='old', description='-')
+        new = Group.objects.create(title='Новая', slug='new', description='-')
+        post = Post.objects.create(
+            author=self.author, group=old, text='Переезжающий пост'
+        )
+        url = reverse('posts:group_list', kwargs={'slug': 'old'})
+        self.assertContains(self.guest_client.get(url), 'Переезжающий пост')
+        client = Client()
+        client.force_login(self.author)
+        client.post(
+            reverse('posts:edit', kwargs={'post_id': post.pk}),
+            {'text': post.text, 'group': new.pk},
+        )
+        self.assertNotContains(
+            self.guest_client.get(url), 'Переезжающий пост'
+        )
+
+    def test_post_save_cost_independent_of_followers(self):
+        """Новый пост не обходит подписчиков, а их лента обновляется."""
+        followers = [
+            User.objects.create_user(username=f'follower{i}')
+            for i in range(3)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=user, author=self.author) for user in followers
+        )
+        client = Client()
+        client.force_login(followers[0])
+        url = reverse('posts:follow_index')
+        response = client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+        with mock.patch('posts.signals.bump', wraps=bump) as signal_bump:
+            Post.objects.create(author=self.author, text='Новый пост')
+        tags, = [call.args for call in signal_bump.call_args_list]
+        self.assertFalse([tag for tag in tags if tag.startswith('follow:')])
+        response = client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
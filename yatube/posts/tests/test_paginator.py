@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from posts.models import Post, User
+from posts.utils import ApproximatePaginator, estimated_count
+
+
+class ApproximatePaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}') for i in range(25)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_elided_page_range(self):
+        paginator = ApproximatePaginator(list(range(1000)), 10)
+        ellipsis = ApproximatePaginator.ELLIPSIS
+        cases = (
+            (1, [1, 2, 3, ellipsis, 100]),
+            (50, [1, ellipsis, 48, 49, 50, 51, 52, ellipsis, 100]),
+            (100, [1, ellipsis, 98, 99, 100]),
+        )
+        for number, expected in cases:
+            with self.subTest(number=number):
+                self.assertEqual(
+                    list(paginator.get_elided_page_range(number)), expected
+                )
+        short = ApproximatePaginator(list(range(30)), 10)
+        self.assertEqual(list(short.get_elided_page_range(2)), [1, 2, 3])
+
+    def test_count_cached_under_tags(self):
+        """Число постов считается один раз, пока тег ленты не сменился."""
+        ApproximatePaginator(
+            Post.objects.all(), 10, tags=('feed:global',)
+        ).count
+        with self.assertNumQueries(0):
+            count = ApproximatePaginator(
+                Post.objects.all(), 10, tags=('feed:global',)
+            ).count
+        self.assertEqual(count, 25)
+        Post.objects.create(author=self.user, text='Новый пост')
+        self.assertEqual(
+            ApproximatePaginator(
+                Post.objects.all(), 10, tags=('feed:global',)
+            ).count,
+            26,
+        )
+
+    @override_settings(PAGINATOR_ESTIMATE_THRESHOLD=20)
+    def test_estimated_count_from_statistics(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimated_count(Post.objects.all()), 25)
+        self.assertEqual(estimated_count(Post.visible.all()), 25)
+        self.assertIsNone(estimated_count(Post.objects.filter(pk=1)))
+        Post.objects.create(author=self.user, text='Новый пост')
+        paginator = ApproximatePaginator(Post.objects.all(), 10)
+        self.assertEqual(paginator.count, 25)
@@ -0,0 +1,114 @@
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PersonalExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый текст',
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=b'GIF89a',
+                content_type='image/gif',
+            ),
+        )
+        Comment.objects.create(
+            post=cls.post,
+            author=cls.author,
+            text='комментарий',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_zip_archive_streams_posts_and_images(self):
+        response = self.authorized_client.get(reverse('posts:export_data'))
+        self.assertTrue(response.streaming)
+        archive = zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content))
+        )
+        self.assertIn(f'media/{self.post.image.name}', archive.namelist())
+        records = [
+            json.loads(line)
+            for line in archive.read('data.ndjson').decode().splitlines()
+        ]
+        self.assertEqual(
+            [record['type'] for record in records], ['post', 'comment']
+        )
+        self.assertEqual(records[0]['text'], 'Тестовый текст')
+
+    def test_ndjson_format(self):
+        response = self.authorized_client.get(
+            reverse('posts:export_data'), {'format': 'ndjson'}
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+
+    def test_archived_posts_and_comments_exported(self):
+        archived = ArchivedPost.objects.create(
+            id=self.post.pk + 1,
+            text='Архивный пост',
+            pub_date=self.post.pub_date,
+            author=self.author,
+        )
+        ArchivedComment.objects.create(
+            id=1,
+            post=archived,
+            author=self.author,
+            text='Архивный комментарий',
+            created=self.post.pub_date,
+        )
+        response = self.authorized_client.get(
+            reverse('posts:export_data'), {'format': 'ndjson'}
+        )
+        records = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).decode()
+            .splitlines()
+        ]
+        self.assertEqual(
+            [(record['type'], record['text']) for record in records],
+            [
+                ('post', 'Тестовый текст'),
+                ('post', 'Архивный пост'),
+                ('comment', 'комментарий'),
+                ('comment', 'Архивный комментарий'),
+            ],
+        )
+
+    def test_hidden_posts_and_comments_exported(self):
+        """Автор получает и скрытые модератором записи."""
+        Post.objects.update(is_hidden=True)
+        Comment.objects.update(is_hidden=True)
+        response = self.authorized_client.get(
+            reverse('posts:export_data'), {'format': 'ndjson'}
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+
+    def test_guest_redirected_to_login(self):
+        response = Client().get(reverse('posts:export_data'))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.templatetags import posts_tags
+
+
+class PostCardsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for i in range(3):
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {i}'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def count_renders(self, url):
+        with mock.patch.object(
+            posts_tags, 'render_to_string', side_effect=render_to_string
+        ) as render:
+            response = self.client.get(url)
+        return response, render.call_count
+
+    def test_new_post_renders_one_card(self):
+        """После нового поста рендерится только его карточка."""
+        url = reverse('posts:index')
+        _, renders = self.count_renders(url)
+        self.assertEqual(renders, 3)
+        Post.objects.create(author=self.user, text='Новый пост')
+        response, renders = self.count_renders(url)
+        self.assertEqual(renders, 1)
+        self.assertContains(response, 'Новый пост')
+
+    def test_cards_shared_between_feeds(self):
+        self.count_renders(reverse('posts:index'))
+        _, renders = self.count_renders(
+            reverse('posts:group_list', kwargs={'slug': 'test_slug'})
+        )
+        self.assertEqual(renders, 0)
+
+    def test_card_follows_post_and_group_changes(self):
+        url = reverse('posts:profile', kwargs={'username': 'auth'})
+        self.client.get(url)
+        post = Post.objects.first()
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertContains(self.client.get(url), 'Исправленный пост')
+        self.group.slug = 'new_slug'
+        self.group.save()
+        self.assertContains(
+            self.client.get(url),
+            reverse('posts:group_list', kwargs={'slug': 'new_slug'}),
+        )
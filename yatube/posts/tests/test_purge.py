@@ -0,0 +1,235 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import moderation, purge
+from posts.models import (
+    ArchivedComment,
+    ArchivedPost,
+    Comment,
+    Follow,
+    Group,
+    ModerationJob,
+    Post,
+    User,
+)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    MODERATION_BATCH_SIZE=2,
+    CACHE_OUTBOX_POLL_INTERVAL=60,
+)
+class PurgeTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='spammer')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='-'
+        )
+        self.posts = [
+            Post.objects.create(
+                author=self.user, group=self.group, text=f'Спам {i}'
+            )
+            for i in range(5)
+        ]
+        self.image_post = Post.objects.create(
+            author=self.user,
+            text='С картинкой',
+            image=SimpleUploadedFile('spam.gif', SMALL_GIF, 'image/gif'),
+        )
+        Comment.objects.create(
+            post=self.posts[0], author=self.reader, text='Ответ'
+        )
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def index_count(self):
+        response = Client().get(reverse('posts:index'))
+        return len(response.context['page_obj'])
+
+    def test_user_hidden_before_purge(self):
+        self.assertEqual(self.index_count(), 6)
+        job = moderation.enqueue(
+            User.objects.filter(pk=self.user.pk), moderation.PURGE, self.admin
+        )
+        self.assertEqual(job.status, ModerationJob.PENDING)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.index_count(), 0)
+        self.assertEqual(Post.objects.count(), 6)
+        response = Client().get(
+            reverse('posts:profile', args=[self.user.username])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_archived_posts_hidden_before_purge(self):
+        post = self.posts[0]
+        archived = ArchivedPost.objects.create(
+            id=post.pk + 100, text='Архивный спам', pub_date=post.pub_date,
+            author=self.user, group=self.group,
+        )
+        ArchivedComment.objects.create(
+            id=1, post=archived, author=self.user, text='Ком',
+            created=post.pub_date,
+        )
+        moderation.enqueue(
+            User.objects.filter(pk=self.user.pk), moderation.PURGE, self.admin
+        )
+        for name in ('posts:post_detail', 'posts:api_post_detail'):
+            with self.subTest(url=name):
+                response = Client().get(reverse(name, args=[archived.pk]))
+                self.assertEqual(response.status_code, 404)
+        self.assertFalse(ArchivedComment.visible.exists())
+
+    def test_visible_filters_by_flags(self):
+        """Ленты прячут удалённых по флагам, а не списком их id."""
+        moderation.enqueue(
+            User.objects.filter(pk=self.user.pk), moderation.PURGE, self.admin
+        )
+        sql = str(Post.visible.all().query)
+        self.assertIn('is_active', sql)
+        self.assertIn('is_deleted', sql)
+        self.assertNotIn(' IN (', sql)
+
+    def test_deleted_user_logged_out(self):
+        """Удалённый сразу выходит, а сессии удаляет фоновая очистка."""
+        author = Client()
+        author.force_login(self.user)
+        url = reverse('posts:post_create')
+        self.assertEqual(author.get(url).status_code, 200)
+        session_key = author.session.session_key
+        purge.mark_deleted(User.objects.filter(pk=self.user.pk))
+        response = author.get(url)
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={url}'
+        )
+        self.assertEqual(self.client.get(url).status_code, 200)
+        purge.purge_user(self.user.pk, 2)
+        self.assertFalse(
+            Session.objects.filter(session_key=session_key).exists()
+        )
+
+    def test_purge_user_in_batches(self):
+        path = self.image_post.image.path
+        self.assertTrue(os.path.exists(path))
+        self.client.post(
+            reverse('admin:auth_user_changelist'),
+            {
+                'action': 'purge_in_background',
+                '_selected_action': [self.user.pk],
+            },
+        )
+        with mock.patch.object(
+            purge, 'delete_in_batches', wraps=purge.delete_in_batches
+        ) as delete_in_batches, mock.patch.object(
+            purge.transaction, 'on_commit', lambda callback: callback()
+        ):
+            moderation.run_pending()
+        self.assertEqual(
+            ModerationJob.objects.get().status, ModerationJob.DONE
+        )
+        self.assertTrue(delete_in_batches.called)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(Post.objects.count(), 0)
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertEqual(Follow.objects.count(), 0)
+        self.assertFalse(os.path.exists(path))
+
+    def test_purge_bumps_once_per_batch(self):
+        """Сигналы строк молчат, теги сбрасываются раз на пачку."""
+        with mock.patch('posts.signals.bump') as signal_bump, \
+                mock.patch.object(purge, 'bump') as batch_bump:
+            purge.purge_user(self.user.pk, 2)
+        # Сам пользователь удаляется одной строкой со своим сигналом.
+        self.assertEqual(signal_bump.call_count, 1)
+        # Подписка, чужой комментарий к посту и три пачки постов.
+        self.assertEqual(batch_bump.call_count, 5)
+        tags = set().union(*(call.args for call in batch_bump.mock_calls))
+        self.assertIn(f'follow:{self.reader.pk}', tags)
+        self.assertIn(f'post:{self.posts[0].pk}', tags)
+        self.assertIn(f'group:{self.group.pk}', tags)
+
+    def test_comments_purged_before_posts(self):
+        """Посты удаляются, когда комментариев к ним уже нет."""
+        def delete_posts(queryset, *args, **kwargs):
+            if queryset.model is Post:
+                self.assertFalse(Comment.objects.exists())
+            return delete_in_batches(queryset, *args, **kwargs)
+
+        delete_in_batches = purge.delete_in_batches
+        with mock.patch.object(purge, 'delete_in_batches', delete_posts):
+            purge.purge_user(self.user.pk, 2)
+        self.assertFalse(Post.objects.exists())
+
+    def test_group_hidden_before_purge(self):
+        self.client.post(
+            reverse('admin:posts_group_changelist'),
+            {
+                'action': 'purge_in_background',
+                '_selected_action': [self.group.pk],
+            },
+        )
+        self.group.refresh_from_db()
+        self.assertTrue(self.group.is_deleted)
+        self.assertEqual(self.index_count(), 1)
+        response = Client().get(
+            reverse('posts:group_list', args=[self.group.slug])
+        )
+        self.assertEqual(response.status_code, 404)
+        moderation.run_pending()
+        self.assertFalse(Group.objects.filter(pk=self.group.pk).exists())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(self.index_count(), 1)
+
+    def test_admin_delete_view_enqueues_purge(self):
+        """Кнопка «Удалить» в админке не удаляет каскадом в запросе."""
+        cases = (
+            ('admin:posts_group_delete', self.group, 'posts.group'),
+            ('admin:auth_user_delete', self.user, 'auth.user'),
+        )
+        for url_name, obj, label in cases:
+            with self.subTest(model=label):
+                url = reverse(url_name, args=[obj.pk])
+                self.assertContains(self.client.get(url), str(obj))
+                response = self.client.post(url, {'post': 'yes'})
+                self.assertEqual(response.status_code, 302)
+                job = ModerationJob.objects.get(model=label)
+                self.assertEqual(job.action, moderation.PURGE)
+                self.assertEqual(Post.objects.count(), 6)
+        self.group.refresh_from_db()
+        self.assertTrue(self.group.is_deleted)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
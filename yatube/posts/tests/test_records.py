@@ -0,0 +1,63 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import ArchivedPost, Group, Post, User
+from posts.records import FeedRecords, PostRecord, post_records
+
+
+class PostRecordsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Иван', last_name='Петров'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='-'
+        )
+        for i in range(3):
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {i}'
+            )
+        Post.objects.create(author=cls.user, text='Без группы')
+
+    def test_records_share_author_and_group(self):
+        with self.assertNumQueries(1):
+            records = post_records(Post.objects.all())
+        self.assertEqual(len(records), 4)
+        self.assertIsInstance(records[0], PostRecord)
+        self.assertIs(records[1].author, records[2].author)
+        self.assertIs(records[1].group, records[2].group)
+        self.assertIsNone(records[0].group)
+        self.assertIsNone(records[0].group_id)
+        self.assertEqual(records[1].author.get_full_name(), 'Иван Петров')
+        self.assertEqual(str(records[1].author), 'auth')
+        self.assertEqual(records[1].group.slug, 'group')
+        self.assertFalse(hasattr(records[0], '__dict__'))
+
+    def test_archived_records(self):
+        post = Post.objects.last()
+        ArchivedPost.objects.create(
+            id=post.pk, text=post.text, pub_date=post.pub_date,
+            author=self.user, group=self.group,
+        )
+        record, = post_records(ArchivedPost.objects.all())
+        self.assertEqual(record.model_name, 'archivedpost')
+        self.assertIsNone(record.updated)
+
+    def test_feed_records_slices(self):
+        feed = FeedRecords(Post.objects.all())
+        self.assertEqual(feed.count(), 4)
+        self.assertEqual([record.preview for record in feed[1:3]], [
+            post.preview for post in Post.objects.all()[1:3]
+        ])
+        self.assertIsNone(feed[0].text)
+        self.assertEqual(feed[0].pk, Post.objects.first().pk)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('feed_benchmark', iterations=1, stdout=out)
+        self.assertIn('записи', out.getvalue())
+        self.assertIn('постов на странице: 4', out.getvalue())
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import ArchivedPost, Post, User
+
+
+@override_settings(POST_PREVIEW_LENGTH=20)
+class RenderedTextTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_save_renders_escaped_html(self):
+        post = Post.objects.create(
+            author=self.user, text='<b>Первая</b>\nвторая строка поста'
+        )
+        self.assertEqual(
+            post.body_html,
+            '&lt;b&gt;Первая&lt;/b&gt;<br>вторая строка поста',
+        )
+        self.assertEqual(post.preview, '&lt;b&gt;Первая&lt;/b&gt;<br>втора…')
+
+    def test_edit_updates_html(self):
+        post = Post.objects.create(author=self.user, text='Старый текст')
+        self.client.post(
+            reverse('posts:edit', args=[post.pk]), {'text': 'Новый текст'}
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.body_html, 'Новый текст')
+        self.assertEqual(post.preview, 'Новый текст')
+
+    def test_feed_defers_full_text(self):
+        Post.objects.create(author=self.user, text='Длинный текст ' * 100)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Длинный текст Длинн…')
+        self.assertFalse(any(
+            '"posts_post"."text"' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    def test_backfill(self):
+        post = Post.objects.create(author=self.user, text='Текст')
+        ArchivedPost.objects.create(
+            id=post.pk + 1, text='Архив', pub_date=post.pub_date,
+            author=self.user,
+        )
+        Post.objects.update(preview='', body_html='')
+        ArchivedPost.objects.update(preview='', body_html='')
+        call_command('backfill_post_html', batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.body_html, 'Текст')
+        self.assertEqual(ArchivedPost.objects.get().preview, 'Архив')
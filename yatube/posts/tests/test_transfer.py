@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import (ArchivedComment, ArchivedPost, Comment, Follow,
+                          Group, Post, User)
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test_slug',
+            description='Тестовый текст',
+        )
+        cls.author = User.objects.create_user(username='author')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый текст',
+            group=cls.group,
+        )
+        Comment.objects.create(
+            post=cls.post,
+            author=cls.follower,
+            text='комментарий',
+        )
+        Follow.objects.create(user=cls.follower, author=cls.author)
+        cls.hidden_post = Post.objects.create(
+            author=cls.author, text='Скрытый', is_hidden=True,
+        )
+        cls.archived = ArchivedPost.objects.create(
+            id=cls.hidden_post.pk + 1, text='Архивный',
+            pub_date=cls.post.pub_date, author=cls.author, group=cls.group,
+        )
+        ArchivedComment.objects.create(
+            id=100, post=cls.archived, author=cls.follower,
+            text='архивный комментарий', created=cls.post.pub_date,
+            is_hidden=True,
+        )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_export_import_round_trip(self):
+        """Выгрузка загружается рядом с исходными данными под новыми id."""
+        for fmt in ('jsonl', 'csv'):
+            with self.subTest(fmt=fmt):
+                call_command(
+                    'export_posts', self.directory,
+                    format=fmt, stdout=StringIO(),
+                )
+                posts_count = Post.objects.count()
+                call_command(
+                    'import_posts', self.directory,
+                    format=fmt, stdout=StringIO(),
+                )
+                self.assertEqual(Post.objects.count(), posts_count * 2)
+                post = Post.objects.filter(is_hidden=False).order_by(
+                    '-pk'
+                ).first()
+                self.assertNotEqual(post.pk, self.post.pk)
+                self.assertEqual(post.pub_date, self.post.pub_date)
+                self.assertEqual(post.author, self.author)
+                self.assertEqual(post.group, self.group)
+                comment = Comment.objects.order_by('-pk').first()
+                self.assertEqual(
+                    Post.objects.filter(is_hidden=True).count(),
+                    posts_count,
+                )
+                archived = ArchivedPost.objects.order_by('-pk').first()
+                self.assertNotEqual(archived.pk, self.archived.pk)
+                self.assertEqual(archived.body_html, 'Архивный')
+                archived_comment = archived.comments.get()
+                self.assertTrue(archived_comment.is_hidden)
+                self.assertEqual(comment.post, post)
+                self.assertEqual(comment.author, self.follower)
+                self.assertEqual(Follow.objects.count(), 1)
+                self.assertEqual(Group.objects.count(), 1)
+
+    def test_comment_of_post_archived_during_export(self):
+        """Пост ушёл в архив между выгрузкой постов и комментариев."""
+        rows = {
+            'post': [],
+            'archived_post': [{
+                'id': 1, 'text': 'Перенесён',
+                'pub_date': '2020-01-01T00:00+00:00', 'author': 'author',
+                'group': None, 'image': '',
+                'archived': '2021-01-01T00:00+00:00',
+            }],
+            'comment': [{
+                'id': 1, 'post': 1, 'author': 'follower', 'text': 'к посту',
+                'created': '2020-01-02T00:00+00:00', 'is_hidden': False,
+            }],
+            'archived_comment': [{
+                'id': 1, 'post': 1, 'author': 'follower', 'text': 'к посту',
+                'created': '2020-01-02T00:00+00:00', 'is_hidden': False,
+            }],
+        }
+        for name, lines in rows.items():
+            path = os.path.join(self.directory, f'{name}.jsonl')
+            with open(path, 'w', encoding='utf-8') as stream:
+                stream.writelines(json.dumps(row) + '\n' for row in lines)
+        comments_count = Comment.objects.count()
+        call_command('import_posts', self.directory, stdout=StringIO())
+        archived = ArchivedPost.objects.get(text='Перенесён')
+        self.assertEqual(archived.comments.get().text, 'к посту')
+        self.assertEqual(Comment.objects.count(), comments_count)
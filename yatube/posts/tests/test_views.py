@@ -78,8 +78,8 @@ class PostPagesTests(TestCase):
                 self.assertTemplateUsed(response, template)
 
     def check_info(self, post):
-        self.assertEqual(post.text, self.post.text)
-        self.assertEqual(post.author, self.post.author)
+        self.assertEqual(post.preview, self.post.preview)
+        self.assertEqual(post.author.id, self.post.author.id)
         self.assertEqual(post.group.id, self.post.group.id)
 
     def test_index_show_correct_context(self):
@@ -143,15 +143,30 @@ class PostPagesTests(TestCase):
         )
         response = self.authorized_client.get(
             reverse('posts:index')).content
-        posts.delete()
-        response_delete = self.authorized_client.get(
+        Post.objects.filter(pk=posts.pk).update(
+            text='Без сигналов', preview='Без сигналов'
+        )
+        response_update = self.authorized_client.get(
             reverse('posts:index')).content
-        self.assertEqual(response, response_delete)
+        self.assertEqual(response, response_update)
         cache.clear()
         response_clear = self.authorized_client.get(
             reverse('posts:index')).content
         self.assertNotEqual(response, response_clear)
 
+    def test_cache_invalidated_on_delete(self):
+        """Удаление поста сбрасывает только помеченные им фрагменты."""
+        posts = Post.objects.create(
+            text='Кэш',
+            author=self.user,
+        )
+        response = self.authorized_client.get(
+            reverse('posts:index')).content
+        posts.delete()
+        response_delete = self.authorized_client.get(
+            reverse('posts:index')).content
+        self.assertNotEqual(response, response_delete)
+
     def test_error(self):
         response = self.authorized_client.get('/non_page/')
         template = 'core/404.html'
@@ -0,0 +1,291 @@
+"""Потоковый экспорт и импорт данных постов в JSONL и CSV.
+
+Строки читаются и пишутся пачками, поэтому расход памяти не зависит от
+размера таблиц. Пользователи и группы сопоставляются по username и slug,
+а id постов и комментариев сдвигаются на максимальный id в базе. Архив
+переносится вместе с горячими таблицами, флаг ``is_hidden`` — тоже.
+"""
+import csv
+import json
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from .models import (ArchivedComment, ArchivedPost, Comment, Follow, Group,
+                     Post, User, render_text)
+
+# Модель, поля для values_list и имена колонок в файле.
+SCHEMA = {
+    'group': (
+        Group,
+        ('id', 'title', 'slug', 'description'),
+        ('id', 'title', 'slug', 'description'),
+    ),
+    'post': (
+        Post,
+        ('id', 'text', 'pub_date', 'author__username', 'group__slug',
+         'image', 'is_hidden'),
+        ('id', 'text', 'pub_date', 'author', 'group', 'image', 'is_hidden'),
+    ),
+    'archived_post': (
+        ArchivedPost,
+        ('id', 'text', 'pub_date', 'author__username', 'group__slug',
+         'image', 'archived'),
+        ('id', 'text', 'pub_date', 'author', 'group', 'image', 'archived'),
+    ),
+    'comment': (
+        Comment,
+        ('id', 'post_id', 'author__username', 'text', 'created',
+         'is_hidden'),
+        ('id', 'post', 'author', 'text', 'created', 'is_hidden'),
+    ),
+    'archived_comment': (
+        ArchivedComment,
+        ('id', 'post_id', 'author__username', 'text', 'created',
+         'is_hidden'),
+        ('id', 'post', 'author', 'text', 'created', 'is_hidden'),
+    ),
+    'follow': (
+        Follow,
+        ('user__username', 'author__username'),
+        ('user', 'author'),
+    ),
+}
+FORMATS = ('jsonl', 'csv')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_rows(name, chunk_size):
+    model, fields, columns = SCHEMA[name]
+    rows = model.objects.order_by('pk').values_list(*fields).iterator(
+        chunk_size=chunk_size
+    )
+    for row in rows:
+        yield dict(zip(columns, row))
+
+
+def write_rows(stream, fmt, name, rows):
+    columns = SCHEMA[name][2]
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=columns)
+        writer.writeheader()
+    for row in rows:
+        if fmt == 'csv':
+            writer.writerow(row)
+        else:
+            stream.write(json.dumps(row, ensure_ascii=False, default=str))
+            stream.write('\n')
+        yield row
+
+
+def read_rows(stream, fmt):
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key: value or None for key, value in row.items()}
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def resolve_users(usernames):
+    usernames = set(filter(None, usernames))
+    users = dict(
+        User.objects.filter(username__in=usernames)
+        .values_list('username', 'id')
+    )
+    missing = usernames - users.keys()
+    if missing:
+        User.objects.bulk_create(
+            User(username=username, password=UNUSABLE_PASSWORD_PREFIX)
+            for username in missing
+        )
+        users.update(
+            User.objects.filter(username__in=missing)
+            .values_list('username', 'id')
+        )
+    return users
+
+
+def resolve_groups(slugs):
+    return dict(
+        Group.objects.filter(slug__in=set(filter(None, slugs)))
+        .values_list('slug', 'id')
+    )
+
+
+def parse_flag(value):
+    """Флаг из JSONL (bool) или CSV (строка); в старых выгрузках его нет."""
+    return value in (True, 'True')
+
+
+def existing_ids(model, ids):
+    return set(model.objects.filter(id__in=ids).values_list('id', flat=True))
+
+
+def id_offset(*models):
+    return max(
+        model.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+        for model in models
+    )
+
+
+@contextmanager
+def keep_auto_now_add(*fields):
+    """Не даёт auto_now_add затереть импортируемые даты."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Importer:
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.post_offset = id_offset(Post, ArchivedPost)
+        self.comment_offset = id_offset(Comment, ArchivedComment)
+
+    def load(self, name, rows):
+        """Загружает строки пачками; отдаёт число строк в каждой пачке."""
+        build = getattr(self, f'build_{name}s')
+        with keep_auto_now_add(
+            Post._meta.get_field('pub_date'),
+            Comment._meta.get_field('created'),
+            ArchivedPost._meta.get_field('archived'),
+        ):
+            for chunk in chunked(rows, self.chunk_size):
+                with transaction.atomic():
+                    self.bulk_create(build(chunk))
+                yield len(chunk)
+
+    def bulk_create(self, objects):
+        by_model = {}
+        for obj in objects:
+            by_model.setdefault(type(obj), []).append(obj)
+        for model, rows in by_model.items():
+            model.objects.bulk_create(
+                rows,
+                batch_size=self.chunk_size,
+                ignore_conflicts=model is Follow,
+            )
+
+    def build_groups(self, chunk):
+        existing = resolve_groups(row['slug'] for row in chunk)
+        return [
+            Group(
+                title=row['title'],
+                slug=row['slug'],
+                description=row['description'],
+            )
+            for row in chunk if row['slug'] not in existing
+        ]
+
+    def build_posts(self, chunk):
+        users = resolve_users(row['author'] for row in chunk)
+        groups = resolve_groups(row['group'] for row in chunk)
+        posts = []
+        for row in chunk:
+            preview, body_html = render_text(row['text'])
+            posts.append(Post(
+                id=int(row['id']) + self.post_offset,
+                text=row['text'],
+                preview=preview,
+                body_html=body_html,
+                pub_date=parse_datetime(row['pub_date']),
+                author_id=users[row['author']],
+                group_id=groups.get(row['group']),
+                image=row['image'] or '',
+                is_hidden=parse_flag(row.get('is_hidden')),
+            ))
+        return posts
+
+    def build_archived_posts(self, chunk):
+        """Архивные посты; уже загруженные как горячие пропускаются.
+
+        Если archive_posts перенёс пост во время выгрузки, он есть
+        в обоих файлах, и горячая копия загружается первой.
+        """
+        users = resolve_users(row['author'] for row in chunk)
+        groups = resolve_groups(row['group'] for row in chunk)
+        ids = [int(row['id']) + self.post_offset for row in chunk]
+        loaded = existing_ids(Post, ids)
+        posts = []
+        for row, post_id in zip(chunk, ids):
+            if post_id in loaded:
+                continue
+            preview, body_html = render_text(row['text'])
+            posts.append(ArchivedPost(
+                id=post_id,
+                text=row['text'],
+                preview=preview,
+                body_html=body_html,
+                pub_date=parse_datetime(row['pub_date']),
+                author_id=users[row['author']],
+                group_id=groups.get(row['group']),
+                image=row['image'] or '',
+                archived=parse_datetime(row['archived']),
+            ))
+        return posts
+
+    def build_comments(self, chunk):
+        """Комментарии попадают в ту таблицу, где лежит их пост.
+
+        Из-за archive_posts во время выгрузки комментарий может оказаться
+        в обоих файлах, а его пост — только в одной из таблиц; повторно
+        он не загружается.
+        """
+        users = resolve_users(row['author'] for row in chunk)
+        post_ids = {
+            int(row['post']) + self.post_offset for row in chunk if row['post']
+        }
+        live = existing_ids(Post, post_ids)
+        archived = existing_ids(ArchivedPost, post_ids - live)
+        known = live | archived
+        ids = [int(row['id']) + self.comment_offset for row in chunk]
+        loaded = (
+            existing_ids(Comment, ids) | existing_ids(ArchivedComment, ids)
+        )
+        comments = []
+        for row, comment_id in zip(chunk, ids):
+            if comment_id in loaded:
+                continue
+            post_id = (
+                int(row['post']) + self.post_offset if row['post'] else None
+            )
+            model = ArchivedComment if post_id in archived else Comment
+            comments.append(model(
+                id=comment_id,
+                post_id=post_id if post_id in known else None,
+                author_id=users.get(row['author']),
+                text=row['text'],
+                created=parse_datetime(row['created']),
+                is_hidden=parse_flag(row.get('is_hidden')),
+            ))
+        return comments
+
+    build_archived_comments = build_comments
+
+    def build_follows(self, chunk):
+        users = resolve_users(
+            username for row in chunk
+            for username in (row['user'], row['author'])
+        )
+        return [
+            Follow(user_id=users[row['user']], author_id=users[row['author']])
+            for row in chunk
+        ]
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'posts'
 
@@ -17,6 +17,7 @@ urlpatterns = [
         name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('export/', views.export_data, name='export_data'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -27,4 +28,26 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('api/posts/', api.index, name='api_index'),
+    path('api/group/<slug:slug>/', api.group_posts, name='api_group_list'),
+    path('api/profile/<str:username>/', api.profile, name='api_profile'),
+    path('api/follow/', api.follow_index, name='api_follow_index'),
+    path('api/posts/<int:post_id>/', api.post_detail, name='api_post_detail'),
+    path('api/new/', api.new_posts_count, name='api_new_posts'),
+    path(
+        'api/new/stream/',
+        api.new_posts_stream,
+        name='api_new_posts_stream'
+    ),
+    path('feeds/<str:fmt>/', feeds.index_feed, name='feed'),
+    path(
+        'feeds/<str:fmt>/group/<slug:slug>/',
+        feeds.group_feed,
+        name='group_feed'
+    ),
+    path(
+        'feeds/<str:fmt>/profile/<str:username>/',
+        feeds.profile_feed,
+        name='profile_feed'
+    ),
 ]
@@ -1,12 +1,139 @@
+import hashlib
+
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+from core.cache.tags import get_or_set_tagged
+
+from .models import Follow
 
 POST_PAGES = 10
 
 
-def get_page_context(posts, request):
-    paginator = Paginator(posts, POST_PAGES)
+def follow_feed_tags(user_id):
+    """Теги ленты подписок: ``follow:<id>`` и ``author:`` каждого автора.
+
+    Пост сбрасывает ленты подписчиков через тег своего автора, поэтому
+    запись не обходит подписчиков. Список авторов кэшируется под
+    ``follow:<id>``, который меняется при подписке и отписке.
+    """
+    authors = get_or_set_tagged(
+        f'following:{user_id}',
+        [f'follow:{user_id}'],
+        lambda: list(Follow.objects.filter(
+            user_id=user_id
+        ).values_list('author_id', flat=True)),
+    )
+    return [f'follow:{user_id}', *(f'author:{pk}' for pk in authors)]
+
+
+def estimated_count(object_list):
+    """Оценка числа строк нефильтрованной таблицы из статистики БД.
+
+    Для SQLite берётся из sqlite_stat1 (её наполняет ANALYZE в
+    sqlite_optimize), для PostgreSQL — из pg_class.reltuples. Фильтр
+    менеджера лент ``visible`` (скрытые посты) фильтром не считается.
+    """
+    if getattr(object_list, 'query', None) is None:
+        return None
+    model = object_list.model
+    managers = (model._default_manager, getattr(model, 'visible', None))
+    query = str(object_list.order_by().query)
+    if not any(
+        manager is not None and query == str(manager.order_by().query)
+        for manager in managers
+    ):
+        return None
+    connection = connections[object_list.db]
+    table = object_list.model._meta.db_table
+    if connection.vendor == 'sqlite':
+        sql = (
+            'SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 '
+            'WHERE tbl = %s'
+        )
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+class ApproximatePaginator(Paginator):
+    """Paginator без COUNT(*) на каждый запрос.
+
+    Число объектов кэшируется под тегами ленты, а для больших
+    нефильтрованных таблиц берётся оценка из статистики БД. Ссылки на
+    страницы отдаются окном вокруг текущей, с многоточиями.
+    """
+
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, tags=(), **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.tags = tags
+
+    @cached_property
+    def count(self):
+        if not self.tags:
+            return self.exact_or_estimated_count()
+        return get_or_set_tagged(
+            self.count_key(),
+            self.tags,
+            self.exact_or_estimated_count,
+            settings.PAGINATOR_COUNT_TIMEOUT,
+        )
+
+    def count_key(self):
+        query = getattr(self.object_list, 'query', None)
+        source = str(query) if query is not None else repr(
+            type(self.object_list)
+        )
+        source += ':' + ','.join(self.tags)
+        digest = hashlib.md5(source.encode()).hexdigest()
+        return f'page_count:{digest}'
+
+    def exact_or_estimated_count(self):
+        estimate = estimated_count(self.object_list)
+        if (
+            estimate is not None
+            and estimate >= settings.PAGINATOR_ESTIMATE_THRESHOLD
+        ):
+            return estimate
+        return Paginator.count.func(self)
+
+    def get_elided_page_range(self, number=1, on_each_side=2, on_ends=1):
+        """Номера страниц окном вокруг number, как в Django 3.2."""
+        number = self.validate_number(number)
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < self.num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(self.num_pages - on_ends + 1, self.num_pages + 1)
+        else:
+            yield from range(number + 1, self.num_pages + 1)
+
+
+def get_page_context(posts, request, *tags):
+    paginator = ApproximatePaginator(posts, POST_PAGES, tags=tags)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return {
         'page_obj': page_obj,
+        'page_range': list(paginator.get_elided_page_range(page_obj.number)),
     }
@@ -1,58 +1,87 @@
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.cache.tags import get_or_set_tagged
+from core.page_cache import add_cache_tags, cache_page_with_holes
+
+from .archive import ArchiveFallthrough, get_post_or_archived
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
-from .utils import get_page_context
+from .models import ArchivedPost, Follow, Group, Post
+from .personal_export import ndjson_lines, zip_chunks
+from .purge import get_author_or_404
+from .records import FeedRecords
+from .utils import follow_feed_tags, get_page_context
 
 
+@cache_page_with_holes
 def index(request):
-    post_list = Post.objects.all()
+    add_cache_tags(request, 'feed:global')
+    post_list = FeedRecords(Post.visible.all())
     template = 'posts/index.html'
-    context = get_page_context(post_list, request)
+    context = get_page_context(post_list, request, 'feed:global')
     return render(request, template, context)
 
 
+@cache_page_with_holes
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = get_object_or_404(Group, slug=slug, is_deleted=False)
+    add_cache_tags(request, f'group:{group.pk}')
     template = 'posts/group_list.html'
-    post_list = Post.objects.filter(group=group)
+    post_list = Post.visible.filter(group=group)
     context = {
-        'post_list': post_list,
         'group': group,
     }
-    context.update(get_page_context(post_list, request))
+    context.update(get_page_context(
+        FeedRecords(post_list), request, f'group:{group.pk}'
+    ))
     return render(request, template, context)
 
 
+@cache_page_with_holes
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = Post.objects.filter(author=author)
+    author = get_author_or_404(username)
+    add_cache_tags(request, f'author:{author.pk}')
+    post_list = ArchiveFallthrough(
+        FeedRecords(Post.visible.filter(author=author)),
+        FeedRecords(ArchivedPost.visible.filter(author=author)),
+    )
     template = 'posts/profile.html'
     post_count = post_list.count
-    following = request.user.is_authenticated
-    if following:
-        following = author.following.filter(user=request.user).exists()
     context = {
         'author': author,
         'post_count': post_count,
-        'following': following,
     }
-    context.update(get_page_context(post_list, request))
+    context.update(
+        get_page_context(post_list, request, f'author:{author.pk}')
+    )
     return render(request, template, context)
 
 
+@cache_page_with_holes
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    post_count = post.author.posts.count()
+    post = get_post_or_archived(post_id)
+    if post is None:
+        raise Http404
+    add_cache_tags(request, f'post:{post.pk}', f'author:{post.author_id}')
+    if post.group_id:
+        add_cache_tags(request, f'group:{post.group_id}')
+    post_count = get_or_set_tagged(
+        f'post_count:{post.author_id}',
+        [f'author:{post.author_id}'],
+        lambda: (post.author.posts(manager='visible').count()
+                 + post.author.archived_posts(manager='visible').count()),
+    )
     template = 'posts/post_detail.html'
-    form = CommentForm(request.POST or None)
-    comments = Comment.objects.all()
+    comments = post.comments(manager='visible').select_related('author')
     context = {
         'post_count': post_count,
         'post': post,
-        'form': form,
+        # Форму рисует дырка comment_form; пустая форма в контексте
+        # нужна только контракту страницы из tests/test_post.py.
+        'form': CommentForm(),
         'comments': comments,
+        'is_archived': isinstance(post, ArchivedPost),
     }
     return render(request, template, context)
 
@@ -113,17 +142,19 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(
+    post_list = FeedRecords(Post.visible.filter(
         author__following__user=request.user
-    )
+    ))
     template = 'posts/follow.html'
-    context = get_page_context(post_list, request)
+    context = get_page_context(
+        post_list, request, *follow_feed_tags(request.user.pk)
+    )
     return render(request, template, context)
 
 
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_author_or_404(username)
     if author != request.user:
         Follow.objects.get_or_create(user=request.user, author=author)
     return redirect('posts:profile', author)
@@ -138,3 +169,23 @@ def profile_unfollow(request, username):
     )
     user_dislake.delete()
     return redirect('posts:profile', username)
+
+
+@login_required
+def export_data(request):
+    """Архив всех постов и комментариев текущего пользователя."""
+    author = request.user
+    if request.GET.get('format') == 'ndjson':
+        response = StreamingHttpResponse(
+            ndjson_lines(author),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        filename = f'{author.username}.ndjson'
+    else:
+        response = StreamingHttpResponse(
+            zip_chunks(author),
+            content_type='application/zip',
+        )
+        filename = f'{author.username}.zip'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -10,11 +10,20 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
+import atexit
 import os
+import shutil
+import sys
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 NUMBER_POSTS = 10
+# Посты старше этого срока переносит в архив `manage.py archive_posts`.
+POSTS_ARCHIVE_AFTER_DAYS = 365
+# manage.py test и pytest: тесты чистят кэш, поэтому у каждого прогона
+# свой файл общего кэша, а не рабочий кэш (и сессии) разработчика.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
 
 
 # Quick-start development settings - unsuitable for production
@@ -24,7 +33,8 @@ NUMBER_POSTS = 10
 SECRET_KEY = ')t5=67)qd!#e&+ll6+@$8-gonu83nczdgf+t6m_mh7sdygu_a!'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Продакшен-профиль включается переменной окружения DJANGO_DEBUG=0.
+DEBUG = os.environ.get('DJANGO_DEBUG', '1') != '0'
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -52,7 +62,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
+    'core.middleware.CacheOutboxMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.RateLimitMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -63,12 +78,21 @@ MIDDLEWARE = [
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+_TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+# Продакшен-профиль: скомпилированные шаблоны держатся в памяти процесса.
+if not DEBUG:
+    _TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', _TEMPLATE_LOADERS),
+    ]
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': _TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -88,11 +112,38 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'timeout': 5,
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'mmap_size': 256 * 1024 * 1024,
+                'cache_size': -64 * 1024,
+                'busy_timeout': 5000,
+                'temp_store': 'MEMORY',
+            },
+        },
     }
 }
 
+# Реплики для чтения. Локально роль реплики играет копия файла базы,
+# которую обновляет `manage.py sync_replica`.
+DATABASE_REPLICAS = []
+if os.getenv('YATUBE_REPLICA_DB'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('YATUBE_REPLICA_DB'),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append('replica')
+DATABASE_ROUTERS = ['core.db.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи пользователь читает из основной базы.
+REPLICA_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -133,6 +184,21 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+# Продакшен-профиль: хеш в именах файлов и заранее сжатые .gz/.br рядом.
+if not DEBUG:
+    STATICFILES_STORAGE = (
+        'core.staticfiles.CompressedManifestStaticFilesStorage'
+    )
+
+# Сессии и пользователь сессии читаются из общего кэша хоста; сессии
+# записываются в базу не чаще раза в SESSION_WRITE_BEHIND_SECONDS.
+SESSION_ENGINE = 'core.sessions'
+SESSION_CACHE_ALIAS = 'shared'
+SESSION_WRITE_BEHIND_SECONDS = 60
+AUTHENTICATION_BACKENDS = ['core.auth.CachedModelBackend']
+AUTH_USER_CACHE_ALIAS = 'shared'
+AUTH_USER_CACHE_TIMEOUT = 300
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -146,8 +212,80 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+SHARED_CACHE_DIR = BASE_DIR
+if TESTING:
+    SHARED_CACHE_DIR = tempfile.mkdtemp(prefix='yatube-test-cache-')
+    atexit.register(shutil.rmtree, SHARED_CACHE_DIR, ignore_errors=True)
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache.backends.TieredCache',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_MAX_ENTRIES': 1000,
+            'LOCAL_TIMEOUT': 5,
+            'STALE_TIMEOUT': 60,
+            'LOCK_TIMEOUT': 10,
+        },
+    },
+    'shared': {
+        'BACKEND': 'core.cache.backends.SQLiteCache',
+        'LOCATION': os.path.join(SHARED_CACHE_DIR, 'cache.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+            'MMAP_SIZE': 64 * 1024 * 1024,
+        },
+    },
 }
+# Срок жизни страниц в core.page_cache; раньше их сбрасывают теги.
+PAGE_CACHE_TIMEOUT = 300
+# posts.utils.ApproximatePaginator: срок кэша числа постов в ленте и
+# размер таблицы, начиная с которого хватает оценки из статистики БД.
+PAGINATOR_COUNT_TIMEOUT = 60 * 60
+PAGINATOR_ESTIMATE_THRESHOLD = 10000
+# Массовые действия админки: объектов в одной транзакции и запуск
+# в потоке сразу после постановки (иначе — manage.py run_moderation_jobs).
+MODERATION_BATCH_SIZE = 200
+MODERATION_RUN_IN_THREAD = True
+# Длина превью поста в лентах, символов.
+POST_PREVIEW_LENGTH = 500
+# Сколько последних постов попадает в RSS/Atom.
+FEED_ITEMS = 50
+# SSE о новых постах: период проверки и жизнь одного соединения, секунды;
+# пауза перед переподключением браузера, миллисекунды. Django 2.2 отдаёт
+# поток из синхронного воркера, и соединение держит его всё это время,
+# поэтому поток короткий, а браузер переподключается с Last-Event-ID.
+# Чтобы держать потоки дольше, api/new/stream/ нужно отдавать
+# отдельным gevent-воркером (gunicorn -k gevent), не общим пулом.
+SSE_POLL_INTERVAL = 5
+SSE_MAX_SECONDS = 25
+SSE_RETRY_MS = 3000
+# Журнал инвалидаций: период опроса в секундах и срок хранения записей.
+CACHE_OUTBOX_POLL_INTERVAL = 0.5
+CACHE_OUTBOX_RETENTION = 60 * 60
+
+# core.ratelimit: вёдра токенов на IP и на пользователя для view,
+# 'число/s|m|h|d'; methods — какие методы тратят токены (по умолчанию POST).
+RATELIMIT_CACHE = 'shared'
+RATELIMITS = {
+    'posts:post_create': {'ip': '30/m', 'user': '10/m'},
+    'posts:add_comment': {'ip': '60/m', 'user': '20/m'},
+    'posts:profile_follow': {
+        'ip': '60/m', 'user': '30/m', 'methods': ('GET', 'POST'),
+    },
+    'users:signup': {'ip': '5/h'},
+}
+
+# core.middleware.CompressionMiddleware: меньшие ответы не сжимаются.
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_CONTENT_TYPES = [
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/xml',
+    'application/javascript',
+    'application/json',
+    'application/x-ndjson',
+    'application/xml',
+    'application/rss+xml',
+    'application/atom+xml',
+]
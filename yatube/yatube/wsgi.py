@@ -14,3 +14,16 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+from core.staticfiles import StaticFilesApplication  # noqa: E402
+
+# Шаблоны компилируются до первого запроса, а не на нём.
+from core.templating import warm_up  # noqa: E402
+
+warm_up()
+
+application = StaticFilesApplication(
+    application, settings.STATIC_ROOT, settings.STATIC_URL
+)